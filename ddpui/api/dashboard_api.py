@@ -58,9 +58,13 @@ def get_dashboard(request):
         org=orguser.org, dataflow_type="orchestrate"
     ).all()
 
+    # fetch 50 (default limit) flow runs for each flow, concurrently
+    flow_runs = prefect_service.get_flow_runs_by_deployment_ids(
+        [flow.deployment_id for flow in org_data_flows], 50
+    )
+
     res = []
 
-    # fetch 50 (default limit) flow runs for each flow
     for flow in org_data_flows:
         block_ids = DataflowBlock.objects.filter(dataflow=flow).values("opb__block_id")
         # if there is one there will typically be several - a sync,
@@ -74,9 +78,7 @@ def get_dashboard(request):
                 "deploymentId": flow.deployment_id,
                 "cron": flow.cron,
                 "deploymentName": flow.deployment_name,
-                "runs": prefect_service.get_flow_runs_by_deployment_id(
-                    flow.deployment_id, 50
-                ),
+                "runs": flow_runs[flow.deployment_id],
                 "lock": (
                     {
                         "lockedBy": lock.locked_by.user.email,
@@ -103,9 +105,13 @@ def get_dashboard_v1(request):
         org=orguser.org, dataflow_type="orchestrate"
     ).all()
 
+    # fetch 50 (default limit) flow runs for each flow, concurrently
+    flow_runs = prefect_service.get_flow_runs_by_deployment_ids(
+        [flow.deployment_id for flow in org_data_flows], 50
+    )
+
     res = []
 
-    # fetch 50 (default limit) flow runs for each flow
     for flow in org_data_flows:
         orgtask_ids = DataflowOrgTask.objects.filter(dataflow=flow).values_list(
             "orgtask__id", flat=True
@@ -119,9 +125,7 @@ def get_dashboard_v1(request):
                 "deploymentId": flow.deployment_id,
                 "cron": flow.cron,
                 "deploymentName": flow.deployment_name,
-                "runs": prefect_service.get_flow_runs_by_deployment_id(
-                    flow.deployment_id, 50
-                ),
+                "runs": flow_runs[flow.deployment_id],
                 "lock": (
                     {
                         "lockedBy": lock.locked_by.user.email,
@@ -42,6 +42,7 @@ from ddpui.core.orgtaskfunctions import (
     create_prefect_deployment_for_dbtcore_task,
     delete_orgtask,
     fetch_orgtask_lock,
+    fetch_orgtask_lock_flow_runs,
 )
 from ddpui.utils.custom_logger import CustomLogger
 from ddpui.utils import secretsmanager
@@ -184,35 +185,6 @@ def post_system_transformation_tasks(request):
     if not os.path.exists(dbt_project_filename):
         raise HttpError(400, dbt_project_filename + " is missing")
 
-    # create a secret block to save the github endpoint url along with token
-    try:
-        gitrepo_access_token = secretsmanager.retrieve_github_token(orguser.org.dbt)
-        gitrepo_url = orguser.org.dbt.gitrepo_url
-
-        if gitrepo_access_token is not None and gitrepo_access_token != "":
-            gitrepo_url = gitrepo_url.replace(
-                "github.com", "oauth2:" + gitrepo_access_token + "@github.com"
-            )
-
-            # store the git oauth endpoint with token in a prefect secret block
-            secret_block = PrefectSecretBlockCreate(
-                block_name=f"{orguser.org.slug}-git-pull-url",
-                secret=gitrepo_url,
-            )
-            block_response = prefect_service.create_secret_block(secret_block)
-
-            # store secret block name block_response["block_name"] in orgdbt
-            OrgPrefectBlockv1.objects.create(
-                org=orguser.org,
-                block_type=SECRET,
-                block_id=block_response["block_id"],
-                block_name=block_response["block_name"],
-            )
-
-    except Exception as error:
-        logger.exception(error)
-        raise HttpError(400, str(error)) from error
-
     with open(dbt_project_filename, "r", encoding="utf-8") as dbt_project_file:
         dbt_project = yaml.safe_load(dbt_project_file)
         if "profile" not in dbt_project:
@@ -235,11 +207,31 @@ def post_system_transformation_tasks(request):
     if warehouse.wtype == "postgres":
         credentials = map_airbyte_keys_to_postgres_keys(credentials)
 
-    # create a dbt cli profile block
+    # create a secret block to save the github endpoint url along with token
+    # and a dbt cli profile block; prefect creates the two concurrently
     try:
+        secret_block = None
+        gitrepo_access_token = secretsmanager.retrieve_github_token(orguser.org.dbt)
+        gitrepo_url = orguser.org.dbt.gitrepo_url
+
+        if gitrepo_access_token is not None and gitrepo_access_token != "":
+            gitrepo_url = gitrepo_url.replace(
+                "github.com", "oauth2:" + gitrepo_access_token + "@github.com"
+            )
+
+            # store the git oauth endpoint with token in a prefect secret block
+            secret_block = PrefectSecretBlockCreate(
+                block_name=f"{orguser.org.slug}-git-pull-url",
+                secret=gitrepo_url,
+            )
+
         cli_block_name = f"{orguser.org.slug}-{profile_name}"
 
-        cli_block_response = prefect_service.create_dbt_cli_profile_block(
+        (
+            block_response,
+            cli_block_response,
+        ) = prefect_service.create_secret_and_dbt_cli_profile_blocks(
+            secret_block,
             cli_block_name,
             profile_name,
             dbt_project_params.target,
@@ -248,6 +240,15 @@ def post_system_transformation_tasks(request):
             credentials,
         )
 
+        if block_response is not None:
+            # store secret block name block_response["block_name"] in orgdbt
+            OrgPrefectBlockv1.objects.create(
+                org=orguser.org,
+                block_type=SECRET,
+                block_id=block_response["block_id"],
+                block_name=block_response["block_name"],
+            )
+
         # save the cli profile block in django db
         cli_profile_block = OrgPrefectBlockv1.objects.create(
             org=orguser.org,
@@ -278,14 +279,19 @@ def get_prefect_transformation_tasks(request):
 
     org_tasks = []
 
-    for org_task in (
+    transform_tasks = (
         OrgTask.objects.filter(
             org=orguser.org,
             task__type__in=["git", "dbt"],
         )
         .order_by("-generated_by")
         .all()
-    ):
+    )
+
+    # flow runs of the locked tasks, to compute lock statuses without a call per task
+    flow_run_map = fetch_orgtask_lock_flow_runs(transform_tasks)
+
+    for org_task in transform_tasks:
         # git pull               : "git" + " " + "pull"
         # dbt run --full-refresh : "dbt" + " " + "run --full-refresh"
         command = org_task.task.type + " " + org_task.get_task_parameters()
@@ -297,7 +303,7 @@ def get_prefect_transformation_tasks(request):
                 "id": org_task.id,
                 "uuid": org_task.uuid,
                 "deploymentId": None,
-                "lock": fetch_orgtask_lock(org_task),
+                "lock": fetch_orgtask_lock(org_task, flow_run_map),
                 "command": command,
                 "generated_by": org_task.generated_by,
                 "seq": TRANSFORM_TASKS_SEQ[org_task.task.slug],
@@ -324,19 +330,23 @@ def delete_system_transformation_tasks(request):
         org=orguser.org,
         block_type=SECRET,
     ).first()
-    if secret_block:
-        logger.info("deleting secret block %s", secret_block.block_name)
-        prefect_service.delete_secret_block(secret_block.block_id)
-        secret_block.delete()
-
     cli_profile_block = OrgPrefectBlockv1.objects.filter(
         org=orguser.org,
         block_type=DBTCLIPROFILE,
     ).first()
-    if cli_profile_block:
-        logger.info("deleting cli profile block %s", cli_profile_block.block_name)
-        prefect_service.delete_dbt_cli_profile_block(cli_profile_block.block_id)
-        cli_profile_block.delete()
+
+    # the two blocks don't depend on each other, delete them from prefect together
+    blocks = [block for block in [secret_block, cli_profile_block] if block]
+    errors = prefect_service.prefect_delete_blocks_concurrently(
+        [block.block_id for block in blocks]
+    )
+    for block, error in zip(blocks, errors):
+        if error is None:
+            logger.info("deleted %s block %s", block.block_type, block.block_name)
+            block.delete()
+    for error in errors:
+        if error is not None:
+            raise error
 
     for org_task in OrgTask.objects.filter(org=orguser.org, task__is_system=True).all():
         _, error = delete_orgtask(org_task)
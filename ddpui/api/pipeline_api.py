@@ -23,7 +23,7 @@ from ddpui.models.org import (
     OrgPrefectBlockv1,
 )
 from ddpui.models.org_user import OrgUser
-from ddpui.models.tasks import DataflowOrgTask, OrgTask
+from ddpui.models.tasks import DataflowOrgTask
 from ddpui.ddpprefect.schema import (
     PrefectDataFlowCreateSchema3,
     PrefectFlowRunSchema,
@@ -39,6 +39,9 @@ from ddpui.core.pipelinefunctions import (
     setup_dbt_core_task_config,
     pipeline_with_orgtasks,
     fetch_pipeline_lock,
+    fetch_pipeline_lock_flow_runs,
+    fetch_orgtasks_by_connection_ids,
+    fetch_orgtasks_by_uuids,
 )
 from ddpui.core.dbtfunctions import gather_dbt_project_params
 from ddpui.auth import has_permission
@@ -49,6 +52,15 @@ pipelineapi = NinjaAPI(urls_namespace="pipeline")
 
 logger = CustomLogger("ddpui")
 
+# the log summary reads the prefect db directly; read once at import
+PREFECT_DB_CONNECTION_INFO = {
+    "host": os.getenv("PREFECT_HOST"),
+    "port": os.getenv("PREFECT_PORT"),
+    "database": os.getenv("PREFECT_DB"),
+    "user": os.getenv("PREFECT_USER"),
+    "password": os.getenv("PREFECT_PASSWORD"),
+}
+
 
 @pipelineapi.exception_handler(ValidationError)
 def ninja_validation_error_handler(request, exc):  # pylint: disable=unused-argument
@@ -109,11 +121,12 @@ def post_prefect_dataflow_v1(request, payload: PrefectDataFlowCreateSchema4):
 
         # only connections with org task will be pushed to pipeline
         payload.connections.sort(key=lambda conn: conn.seq)
+        connection_orgtasks = fetch_orgtasks_by_connection_ids(
+            orguser.org, [connection.id for connection in payload.connections]
+        )
         for connection in payload.connections:
             logger.info(connection)
-            org_task = OrgTask.objects.filter(
-                org=orguser.org, connection_id=connection.id
-            ).first()
+            org_task = connection_orgtasks.get(connection.id)
             if org_task is None:
                 logger.info(
                     f"connection id {connection.id} not found in org tasks; ignoring this airbyte sync"
@@ -155,8 +168,11 @@ def post_prefect_dataflow_v1(request, payload: PrefectDataFlowCreateSchema4):
 
         payload.transformTasks.sort(key=lambda task: task.seq)  # sort the tasks by seq
 
+        transform_orgtasks = fetch_orgtasks_by_uuids(
+            [transform_task.uuid for transform_task in payload.transformTasks]
+        )
         for transform_task in payload.transformTasks:
-            org_task = OrgTask.objects.filter(uuid=transform_task.uuid).first()
+            org_task = transform_orgtasks.get(transform_task.uuid)
             if org_task is None:
                 logger.error(f"org task with {transform_task.uuid} not found")
                 continue
@@ -245,6 +261,12 @@ def get_prefect_dataflows_v1(request):
             else False
         )
 
+    # flow runs of the running pipelines, to compute lock statuses without a call per dataflow
+    flow_run_map = fetch_pipeline_lock_flow_runs(org_data_flows)
+
+    # the last runs of all the pipelines, fetched concurrently
+    last_runs = prefect_service.get_last_flow_runs_by_deployment_ids(deployment_ids)
+
     res = []
 
     for flow in org_data_flows:
@@ -255,15 +277,13 @@ def get_prefect_dataflows_v1(request):
                 "deploymentId": flow.deployment_id,
                 "cron": flow.cron,
                 "deploymentName": flow.deployment_name,
-                "lastRun": prefect_service.get_last_flow_run_by_deployment_id(
-                    flow.deployment_id
-                ),
+                "lastRun": last_runs[flow.deployment_id],
                 "status": (
                     is_deployment_active[flow.deployment_id]
                     if flow.deployment_id in is_deployment_active
                     else False
                 ),
-                "lock": fetch_pipeline_lock(flow),
+                "lock": fetch_pipeline_lock(flow, flow_run_map),
             }
         )
 
@@ -395,11 +415,12 @@ def put_prefect_dataflow_v1(
             raise HttpError(400, "airbyte server block not found")
 
         payload.connections.sort(key=lambda conn: conn.seq)
+        connection_orgtasks = fetch_orgtasks_by_connection_ids(
+            orguser.org, [connection.id for connection in payload.connections]
+        )
         for connection in payload.connections:
             logger.info(connection)
-            org_task = OrgTask.objects.filter(
-                org=orguser.org, connection_id=connection.id
-            ).first()
+            org_task = connection_orgtasks.get(connection.id)
             if org_task is None:
                 logger.info(
                     f"connection id {connection.id} not found in org tasks; ignoring this airbyte sync"
@@ -441,8 +462,11 @@ def put_prefect_dataflow_v1(
 
         payload.transformTasks.sort(key=lambda task: task.seq)  # sort the tasks by seq
 
+        transform_orgtasks = fetch_orgtasks_by_uuids(
+            [transform_task.uuid for transform_task in payload.transformTasks]
+        )
         for transform_task in payload.transformTasks:
-            org_task = OrgTask.objects.filter(uuid=transform_task.uuid).first()
+            org_task = transform_orgtasks.get(transform_task.uuid)
             if org_task is None:
                 logger.error(f"org task with {transform_task.uuid} not found")
                 continue
@@ -620,14 +644,7 @@ def get_flow_runs_logs(
 def get_flow_runs_logsummary(request, flow_run_id):  # pylint: disable=unused-argument
     """return the logs from a flow-run"""
     try:
-        connection_info = {
-            "host": os.getenv("PREFECT_HOST"),
-            "port": os.getenv("PREFECT_PORT"),
-            "database": os.getenv("PREFECT_DB"),
-            "user": os.getenv("PREFECT_USER"),
-            "password": os.getenv("PREFECT_PASSWORD"),
-        }
-        result = parse_prefect_logs(connection_info, flow_run_id)
+        result = parse_prefect_logs(PREFECT_DB_CONNECTION_INFO, flow_run_id)
     except Exception as error:
         logger.exception(error)
         raise HttpError(400, "failed to retrieve logs") from error
@@ -665,8 +682,12 @@ def get_prefect_flow_runs_log_history(
     )
 
     if fetchlogs:
+        # the logs of all the flow runs are fetched at once
+        flow_runs_logs = prefect_service.get_flow_runs_logs_by_ids(
+            [flow_run["id"] for flow_run in flow_runs]
+        )
         for flow_run in flow_runs:
-            logs_dict = prefect_service.get_flow_run_logs(flow_run["id"], 0)
+            logs_dict = flow_runs_logs[flow_run["id"]]
             flow_run["logs"] = (
                 logs_dict["logs"]["logs"] if "logs" in logs_dict["logs"] else []
             )
@@ -2,6 +2,10 @@ import os
 
 from celery import Celery
 
+from ddpui.utils.eventloop import use_uvloop
+
+use_uvloop()
+
 # Set the default Django settings module for the 'celery' program.
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ddpui.settings')
 
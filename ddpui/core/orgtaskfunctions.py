@@ -121,13 +121,33 @@ def delete_orgtask(org_task: OrgTask):
     return None, None
 
 
-def fetch_orgtask_lock(org_task: OrgTask):
-    """fetch the lock status of an orgtask"""
+def fetch_orgtask_lock_flow_runs(org_tasks: list[OrgTask]) -> dict:
+    """
+    fetch the flow runs of all locks held on these orgtasks in one go;
+    returns the flow_run_map for fetch_orgtask_lock
+    """
+    flow_run_ids = (
+        TaskLock.objects.filter(orgtask__in=org_tasks)
+        .exclude(flow_run_id="")
+        .values_list("flow_run_id", flat=True)
+    )
+    return prefect_service.get_flow_runs_by_ids(list(flow_run_ids))
+
+
+def fetch_orgtask_lock(org_task: OrgTask, flow_run_map: dict = None):
+    """
+    fetch the lock status of an orgtask
+    flow_run_map is {flow_run_id: flow_run} prefetched by the caller for a list of orgtasks;
+    without it the lock's flow run is fetched from prefect
+    """
     lock = TaskLock.objects.filter(orgtask=org_task).first()
     if lock:
         lock_status = TaskLockStatus.QUEUED
         if lock.flow_run_id:
-            flow_run = prefect_service.get_flow_run(lock.flow_run_id)
+            if flow_run_map is not None:
+                flow_run = flow_run_map.get(lock.flow_run_id)
+            else:
+                flow_run = prefect_service.get_flow_run(lock.flow_run_id)
             if flow_run and flow_run["state_type"] in ["SCHEDULED", "PENDING"]:
                 lock_status = TaskLockStatus.QUEUED
             elif flow_run and flow_run["state_type"] == "RUNNING":
@@ -3,6 +3,10 @@ functions to work with pipelies/dataflows
 do not raise http errors here
 """
 
+from dataclasses import dataclass
+
+from django.db.models import prefetch_related_objects
+
 from ddpui.models.tasks import OrgTask, DataflowOrgTask, TaskLock, TaskLockStatus
 from ddpui.models.org import Org, OrgPrefectBlockv1, OrgDataFlowv1
 from ddpui.utils.custom_logger import CustomLogger
@@ -27,7 +31,79 @@ from ddpui.ddpdbt.schema import DbtProjectParams
 
 logger = CustomLogger("ddpui")
 
+
 ####################### big config dictionaries ##################################
+# the _*_task_dict functions build the prefect payloads directly from our own models,
+# which skips pydantic validation when assembling large pipelines; they must produce the
+# same payloads as the validated setup_* functions below
+
+
+def _airbyte_sync_task_dict(
+    org_task: OrgTask, server_block: OrgPrefectBlockv1, seq: int = 1
+) -> dict:
+    """the prefect payload for an airbyte sync, same as PrefectAirbyteSyncTaskSetup.to_json"""
+    return {
+        "slug": org_task.task.slug,
+        "airbyte_server_block": server_block.block_name,
+        "connection_id": org_task.connection_id,
+        "timeout": AIRBYTE_SYNC_TIMEOUT,
+        "type": AIRBYTECONNECTION,
+        "orgtask_uuid": str(org_task.uuid),
+        "flow_name": None,
+        "flow_run_name": None,
+        "seq": seq,
+    }
+
+
+def _dbt_core_task_dict(
+    org_task: OrgTask,
+    cli_profile_block: OrgPrefectBlockv1,
+    dbt_project_params: DbtProjectParams,
+    seq: int = 1,
+) -> dict:
+    """the prefect payload for a dbt job, same as PrefectDbtTaskSetup.to_json"""
+    return {
+        "type": DBTCORE,
+        "slug": org_task.task.slug,
+        "profiles_dir": f"{dbt_project_params.project_dir}/profiles/",
+        "project_dir": dbt_project_params.project_dir,
+        "working_dir": dbt_project_params.project_dir,
+        "orgtask_uuid": str(org_task.uuid),
+        "env": {},
+        "commands": [
+            f"{dbt_project_params.dbt_binary} {org_task.get_task_parameters()} --target {dbt_project_params.target}"
+        ],
+        "cli_profile_block": cli_profile_block.block_name,
+        "cli_args": [],
+        "flow_name": None,
+        "flow_run_name": None,
+        "seq": seq,
+    }
+
+
+def _git_pull_shell_task_dict(
+    org_task: OrgTask,
+    project_dir: str,
+    gitpull_secret_block: OrgPrefectBlockv1,
+    seq: int = 1,
+) -> dict:
+    """the prefect payload for a git pull, same as PrefectShellTaskSetup.to_json"""
+    shell_env = {"secret-git-pull-url-block": ""}
+
+    if gitpull_secret_block is not None:
+        shell_env["secret-git-pull-url-block"] = gitpull_secret_block.block_name
+
+    return {
+        "seq": seq,
+        "type": SHELLOPERATION,
+        "commands": [f"git {org_task.get_task_parameters()}"],
+        "working_dir": project_dir,
+        "env": shell_env,
+        "orgtask_uuid": str(org_task.uuid),
+        "slug": org_task.task.slug,
+        "flow_name": None,
+        "flow_run_name": None,
+    }
 
 
 def setup_airbyte_sync_task_config(
@@ -168,6 +244,51 @@ def setup_git_pull_shell_task_config(
 #     return (org_tasks, task_configs), None
 
 
+@dataclass(frozen=True)
+class _TaskConfigContext:
+    """the blocks and dbt params shared by all the task configs of one pipeline"""
+
+    server_block: OrgPrefectBlockv1 = None
+    cli_block: OrgPrefectBlockv1 = None
+    dbt_project_params: DbtProjectParams = None
+    gitpull_secret_block: OrgPrefectBlockv1 = None
+
+
+def _airbyte_sync_task_config(
+    org_task: OrgTask, seq: int, context: _TaskConfigContext
+) -> dict:
+    """task config for an airbyte sync in a pipeline"""
+    return _airbyte_sync_task_dict(org_task, context.server_block, seq)
+
+
+def _git_pull_shell_task_config(
+    org_task: OrgTask, seq: int, context: _TaskConfigContext
+) -> dict:
+    """task config for a git pull in a pipeline"""
+    return _git_pull_shell_task_dict(
+        org_task,
+        context.dbt_project_params.project_dir,
+        context.gitpull_secret_block,
+        seq,
+    )
+
+
+def _dbt_core_task_config(
+    org_task: OrgTask, seq: int, context: _TaskConfigContext
+) -> dict:
+    """task config for a dbt command in a pipeline"""
+    return _dbt_core_task_dict(
+        org_task, context.cli_block, context.dbt_project_params, seq
+    )
+
+
+# task slug => task config builder; every other task is a dbt task
+TASK_CONFIG_BUILDERS = {
+    TASK_AIRBYTESYNC: _airbyte_sync_task_config,
+    TASK_GITPULL: _git_pull_shell_task_config,
+}
+
+
 def pipeline_with_orgtasks(
     org: Org,
     org_tasks: list[OrgTask],
@@ -182,49 +303,64 @@ def pipeline_with_orgtasks(
     """
     task_configs = []
 
-    for org_task in org_tasks:
-        task_config = None
-        if org_task.task.slug == TASK_AIRBYTESYNC:
-            task_config = setup_airbyte_sync_task_config(
-                org_task, server_block
-            ).to_json()
-        elif org_task.task.slug == TASK_GITPULL:
-            gitpull_secret_block = OrgPrefectBlockv1.objects.filter(
-                org=org, block_type=SECRET, block_name__contains="git-pull"
-            ).first()
-
-            if not gitpull_secret_block:
-                logger.info(
-                    f"secret block for {org_task.task.slug} not found in org prefect blocks;"
-                )
-            task_config = setup_git_pull_shell_task_config(
-                org_task, dbt_project_params.project_dir, gitpull_secret_block
-            ).to_json()
-        else:
-            task_config = setup_dbt_core_task_config(
-                org_task, cli_block, dbt_project_params
-            ).to_json()
-
-        if task_config:
-            task_configs.append(task_config)
-            task_config["seq"] = start_seq
-            start_seq += 1
+    # fetch the master tasks for all org tasks in one query
+    prefetch_related_objects(org_tasks, "task")
+
+    # the git-pull secret block is per org, look it up once for the whole pipeline
+    # and pass it down to the git pull task configs
+    gitpull_secret_block = None
+    if any(org_task.task.slug == TASK_GITPULL for org_task in org_tasks):
+        gitpull_secret_block = OrgPrefectBlockv1.objects.filter(
+            org=org, block_type=SECRET, block_name__contains="git-pull"
+        ).first()
+
+        if not gitpull_secret_block:
+            logger.info(
+                f"secret block for {TASK_GITPULL} not found in org prefect blocks;"
+            )
+
+    context = _TaskConfigContext(
+        server_block=server_block,
+        cli_block=cli_block,
+        dbt_project_params=dbt_project_params,
+        gitpull_secret_block=gitpull_secret_block,
+    )
+    for seq, org_task in enumerate(org_tasks, start=start_seq):
+        build_task_config = TASK_CONFIG_BUILDERS.get(
+            org_task.task.slug, _dbt_core_task_config
+        )
+        task_configs.append(build_task_config(org_task, seq, context))
 
     return task_configs, None
 
 
-def fetch_pipeline_lock(dataflow: OrgDataFlowv1):
+def fetch_pipeline_lock(dataflow: OrgDataFlowv1, flow_run_map: dict = None):
     """
     fetch the lock status of an dataflow/deployment
+    flow_run_map is {flow_run_id: flow_run} prefetched by the caller for a list of dataflows;
+    without it the lock's flow run is fetched from prefect
     """
-    org_task_ids = DataflowOrgTask.objects.filter(dataflow=dataflow).values_list(
-        "orgtask_id", flat=True
+    # the orgtask ids go in as a subquery and the lock's user is joined in, so this is a
+    # single round trip to the db; only the columns used below are read
+    lock = (
+        TaskLock.objects.select_related("locked_by__user")
+        .only(
+            "locked_at", "flow_run_id", "locking_dataflow_id", "locked_by__user__email"
+        )
+        .filter(
+            orgtask_id__in=DataflowOrgTask.objects.filter(dataflow=dataflow).values(
+                "orgtask_id"
+            )
+        )
+        .first()
     )
-    lock = TaskLock.objects.filter(orgtask_id__in=org_task_ids).first()
     if lock:
         lock_status = TaskLockStatus.QUEUED
         if lock.flow_run_id:
-            flow_run = prefect_service.get_flow_run(lock.flow_run_id)
+            if flow_run_map is not None:
+                flow_run = flow_run_map.get(lock.flow_run_id)
+            else:
+                flow_run = prefect_service.get_flow_run(lock.flow_run_id)
             if flow_run and flow_run["state_type"] in ["SCHEDULED", "PENDING"]:
                 lock_status = TaskLockStatus.QUEUED
             elif flow_run and flow_run["state_type"] == "RUNNING":
@@ -238,9 +374,44 @@ def fetch_pipeline_lock(dataflow: OrgDataFlowv1):
             "flowRunId": lock.flow_run_id,
             "status": (
                 lock_status
-                if lock.locking_dataflow == dataflow
+                if lock.locking_dataflow_id == dataflow.id
                 else TaskLockStatus.LOCKED
             ),
         }
 
     return None
+
+
+def fetch_pipeline_lock_flow_runs(dataflows: list[OrgDataFlowv1]) -> dict:
+    """
+    fetch the flow runs of all locks held on the orgtasks of these dataflows in one go;
+    returns the flow_run_map for fetch_pipeline_lock
+    """
+    flow_run_ids = (
+        TaskLock.objects.filter(
+            orgtask_id__in=DataflowOrgTask.objects.filter(
+                dataflow__in=dataflows
+            ).values("orgtask_id")
+        )
+        .exclude(flow_run_id="")
+        .values_list("flow_run_id", flat=True)
+    )
+    return prefect_service.get_flow_runs_by_ids(list(flow_run_ids))
+
+
+def fetch_orgtasks_by_connection_ids(org: Org, connection_ids: list[str]) -> dict:
+    """fetch the org tasks of several airbyte connections in one query, keyed by connection id"""
+    return {
+        org_task.connection_id: org_task
+        for org_task in OrgTask.objects.filter(
+            org=org, connection_id__in=connection_ids
+        ).select_related("task")
+    }
+
+
+def fetch_orgtasks_by_uuids(uuids: list[str]) -> dict:
+    """fetch several org tasks in one query, keyed by uuid"""
+    return {
+        str(org_task.uuid): org_task
+        for org_task in OrgTask.objects.filter(uuid__in=uuids).select_related("task")
+    }
@@ -7,6 +7,7 @@ These functions do not access the Dalgo database
 import os
 from typing import Dict, List
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 from ninja.errors import HttpError
 from ddpui.ddpairbyte import schema
@@ -21,23 +22,31 @@ from ddpui.ddpairbyte.schema import (
 
 load_dotenv()
 
+# read once at import instead of on every request to the airbyte server
+AIRBYTE_API_URL = (
+    f"http://{os.getenv('AIRBYTE_SERVER_HOST')}:{os.getenv('AIRBYTE_SERVER_PORT')}"
+    f"/api/{os.getenv('AIRBYTE_SERVER_APIVER')}"
+)
+AIRBYTE_AUTH_HEADERS = {"Authorization": f"Basic {os.getenv('AIRBYTE_API_TOKEN')}"}
+
+# a single session for all calls to the airbyte server so that connections are kept alive
+# and reused; every airbyte api is a POST so nothing is retried
+http_session = requests.Session()
+http_adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32)
+http_session.mount("http://", http_adapter)
+http_session.mount("https://", http_adapter)
 
 logger = CustomLogger("airbyte")
 
 
 def abreq(endpoint, req=None, **kwargs):
     """Request to the airbyte server"""
-    abhost = os.getenv("AIRBYTE_SERVER_HOST")
-    abport = os.getenv("AIRBYTE_SERVER_PORT")
-    abver = os.getenv("AIRBYTE_SERVER_APIVER")
-    token = os.getenv("AIRBYTE_API_TOKEN")
-
     logger.info("Making request to Airbyte server: %s", endpoint)
 
     try:
-        res = requests.post(
-            f"http://{abhost}:{abport}/api/{abver}/{endpoint}",
-            headers={"Authorization": f"Basic {token}"},
+        res = http_session.post(
+            f"{AIRBYTE_API_URL}/{endpoint}",
+            headers=AIRBYTE_AUTH_HEADERS,
             json=req,
             timeout=kwargs.get("timeout", 30),
         )
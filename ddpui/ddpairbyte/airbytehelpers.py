@@ -2,8 +2,10 @@
 functions which work with airbyte and with the dalgo database
 """
 
+import copy
 import json
 import re
+from collections import defaultdict
 from django.utils.text import slugify
 from django.conf import settings
 from ddpui.ddpairbyte import airbyte_service
@@ -28,7 +30,7 @@ from ddpui.utils.helpers import generate_hash_id, update_dict_but_not_stars
 from ddpui.utils import secretsmanager
 from ddpui.assets.whitelist import DEMO_WHITELIST_SOURCES
 from ddpui.core.pipelinefunctions import setup_airbyte_sync_task_config
-from ddpui.core.orgtaskfunctions import fetch_orgtask_lock
+from ddpui.core.orgtaskfunctions import fetch_orgtask_lock, fetch_orgtask_lock_flow_runs
 
 logger = CustomLogger("airbyte")
 
@@ -267,6 +269,27 @@ def get_connections(org: Org):
 
     warehouse = OrgWarehouse.objects.filter(org=org).first()
 
+    # the dataflows of all the connections, in one query
+    dataflow_orgtasks = defaultdict(list)
+    for df_orgtask in (
+        DataflowOrgTask.objects.filter(orgtask__in=org_tasks)
+        .select_related("dataflow")
+        .order_by("id")
+    ):
+        dataflow_orgtasks[df_orgtask.orgtask_id].append(df_orgtask)
+
+    # a pipeline usually syncs several connections, fetch its last run only once
+    last_run_by_deployment = prefect_service.get_last_flow_runs_by_deployment_ids(
+        [
+            df_orgtask.dataflow.deployment_id
+            for df_orgtasks in dataflow_orgtasks.values()
+            for df_orgtask in df_orgtasks
+        ]
+    )
+
+    # flow runs of the locked connections, to compute lock statuses without a call per connection
+    flow_run_map = fetch_orgtask_lock_flow_runs(org_tasks)
+
     for org_task in org_tasks:
         # fetch the connection
         connection = airbyte_service.get_connection(
@@ -276,12 +299,8 @@ def get_connections(org: Org):
         # a single connection will have a manual deployment and (usually) a pipeline
         # we want to show the last sync, from whichever
         last_runs = []
-        for df_orgtask in DataflowOrgTask.objects.filter(
-            orgtask=org_task,
-        ):
-            run = prefect_service.get_last_flow_run_by_deployment_id(
-                df_orgtask.dataflow.deployment_id
-            )
+        for df_orgtask in dataflow_orgtasks[org_task.id]:
+            run = last_run_by_deployment[df_orgtask.dataflow.deployment_id]
             if run:
                 last_runs.append(run)
 
@@ -291,9 +310,14 @@ def get_connections(org: Org):
             )
         )
 
-        sync_dataflow = DataflowOrgTask.objects.filter(
-            orgtask=org_task, dataflow__dataflow_type="manual"
-        ).first()
+        sync_dataflow = next(
+            (
+                df_orgtask
+                for df_orgtask in dataflow_orgtasks[org_task.id]
+                if df_orgtask.dataflow.dataflow_type == "manual"
+            ),
+            None,
+        )
 
         connection["destination"]["name"] = warehouse.name
         res.append(
@@ -310,7 +334,7 @@ def get_connections(org: Org):
                 ),
                 "lastRun": last_runs[-1] if len(last_runs) > 0 else None,
                 "lock": fetch_orgtask_lock(
-                    org_task
+                    org_task, flow_run_map
                 ),  # this will have the status of the flow run
             }
         )
@@ -520,7 +544,9 @@ def update_destination(
         warehouse.name = payload.name
         warehouse.save()
 
-    dbt_credentials = secretsmanager.retrieve_warehouse_credentials(warehouse)
+    stored_credentials = secretsmanager.retrieve_warehouse_credentials(warehouse)
+    # the snowflake branch below edits the credentials in place
+    dbt_credentials = copy.deepcopy(stored_credentials)
 
     if warehouse.wtype == "postgres":
         dbt_credentials = update_dict_but_not_stars(payload.config)
@@ -545,7 +571,9 @@ def update_destination(
     else:
         return None, "unknown warehouse type " + warehouse.wtype
 
-    secretsmanager.update_warehouse_credentials(warehouse, dbt_credentials)
+    # the cli profile below is updated regardless, which re-syncs one that has drifted
+    if dbt_credentials != stored_credentials:
+        secretsmanager.update_warehouse_credentials(warehouse, dbt_credentials)
 
     cli_profile_block = OrgPrefectBlockv1.objects.filter(
         org=org, block_type=DBTCLIPROFILE
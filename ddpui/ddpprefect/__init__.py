@@ -10,3 +10,13 @@ SECRET = "Secret"
 FLOW_RUN_FAILED = "FAILED"
 FLOW_RUN_COMPLETED = "COMPLETED"
 FLOW_RUN_SCHEDULED = "SCHEDULED"
+FLOW_RUN_CANCELLED = "CANCELLED"
+FLOW_RUN_CRASHED = "CRASHED"
+
+# a flow run in one of these states will not change any more
+FLOW_RUN_TERMINAL_STATE_TYPES = [
+    FLOW_RUN_COMPLETED,
+    FLOW_RUN_FAILED,
+    FLOW_RUN_CANCELLED,
+    FLOW_RUN_CRASHED,
+]
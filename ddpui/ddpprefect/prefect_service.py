@@ -1,9 +1,22 @@
 import os
+import asyncio
+import statistics
+import threading
+import time
+from collections import deque
+from urllib.parse import urlencode
+import httpx
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from ninja.errors import HttpError
 from dotenv import load_dotenv
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
 from django.db import transaction
+from django.utils.dateparse import parse_datetime
 from ddpui.ddpprefect.schema import (
     PrefectDbtCoreSetup,
     PrefectShellSetup,
@@ -18,7 +31,9 @@ from ddpui.ddpprefect.schema import (
     PrefectDbtTaskSetup,
     PrefectDataFlowUpdateSchema3,
 )
+from ddpui.ddpprefect import FLOW_RUN_TERMINAL_STATE_TYPES
 from ddpui.utils.custom_logger import CustomLogger
+from ddpui.utils.timezone import as_utc
 from ddpui.models.tasks import DataflowOrgTask, TaskLock
 from ddpui.models.orgjobs import BlockLock, DataflowBlock
 from ddpui.models.org_user import OrgUser
@@ -28,10 +43,71 @@ load_dotenv()
 
 PREFECT_PROXY_API_URL = os.getenv("PREFECT_PROXY_API_URL")
 http_timeout = int(os.getenv("PREFECT_HTTP_TIMEOUT", "30"))
+# read once at import, every airbyte server block points at the same server
+AIRBYTE_SERVER_BLOCK_CONFIG = {
+    "serverHost": os.getenv("AIRBYTE_SERVER_HOST"),
+    "serverPort": os.getenv("AIRBYTE_SERVER_PORT"),
+    "apiVersion": os.getenv("AIRBYTE_SERVER_APIVER"),
+}
+
+# a single session for all calls to the proxy so that connections are kept alive and reused
+http_session = requests.Session()
+http_adapter = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    # requests which never reached the proxy are retried, and so are GETs on gateway errors;
+    # a read timeout is not retried, the proxy may have the request and the worker would
+    # block for another timeout; the last response is returned as-is
+    max_retries=Retry(
+        total=2,
+        read=0,
+        backoff_factor=0.1,
+        status_forcelist=[502, 503, 504],
+        allowed_methods=frozenset(["GET"]),
+        raise_on_status=False,
+    ),
+)
+http_session.mount("http://", http_adapter)
+http_session.mount("https://", http_adapter)
 
 logger = CustomLogger("ddpui")
 
 
+def _json_body(payload) -> bytes:
+    """
+    serialize a request body for the proxy; orjson is several times faster than the stdlib
+    json that requests would use, which matters for the large deployment payloads
+    bodies which are already serialized are sent as they are
+    """
+    if isinstance(payload, bytes):
+        return payload
+    return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _json_response(res) -> dict:
+    """decode a response from the proxy with orjson, the log pages in particular are large"""
+    return orjson.loads(res.content)
+
+
+# flow runs which have finished are cached for a day, their state won't change any more
+FLOW_RUN_CACHE_TIMEOUT = 3600 * 24
+# and so are their logs, for long enough to page through them
+FLOW_RUN_LOGS_CACHE_TIMEOUT = 60 * 5
+# prefect writes the last batch of a flow run's logs after its terminal state, i.e. after the
+# webhook has fired; logs fetched this soon after we first saw the run finish aren't cached
+FLOW_RUN_LOGS_GRACE_PERIOD = 60
+# reads on the log viewer's path are sent a second time once the first has taken longer than
+# the p95 of recent calls, HEDGE_AFTER until there are enough calls to know it
+HEDGE_AFTER = 1.0
+HEDGE_MIN_SAMPLES = 20
+flow_run_logs_latencies = deque(maxlen=200)
+# the most hedge requests outstanding at once in this process, across all fan-outs
+MAX_OUTSTANDING_HEDGES = 4
+hedge_slots = threading.BoundedSemaphore(MAX_OUTSTANDING_HEDGES)
+# the connection pool of a fan-out
+MAX_CONCURRENT_REQUESTS = 16
+
+
 # ================================================================================================
 def prefect_get(endpoint: str, **kwargs) -> dict:
     """make a GET request to the proxy"""
@@ -41,7 +117,7 @@ def prefect_get(endpoint: str, **kwargs) -> dict:
     timeout = kwargs.pop("timeout", http_timeout)
 
     try:
-        res = requests.get(
+        res = http_session.get(
             f"{PREFECT_PROXY_API_URL}/proxy/{endpoint}",
             headers=headers,
             timeout=timeout,
@@ -54,22 +130,23 @@ def prefect_get(endpoint: str, **kwargs) -> dict:
     except Exception as error:
         logger.exception(error)
         raise HttpError(res.status_code, res.text) from error
-    return res.json()
+    return _json_response(res)
 
 
-def prefect_post(endpoint: str, json: dict, **kwargs) -> dict:
+def prefect_post(endpoint: str, json: dict | bytes, **kwargs) -> dict:
     """make a POST request to the proxy"""
     # we send headers and timeout separately from kwargs, just to be explicit about it
     headers = kwargs.pop("headers", {})
     headers["x-ddp-org"] = logger.get_slug()
+    headers["Content-Type"] = "application/json"
     timeout = kwargs.pop("timeout", http_timeout)
 
     try:
-        res = requests.post(
+        res = http_session.post(
             f"{PREFECT_PROXY_API_URL}/proxy/{endpoint}",
             headers=headers,
             timeout=timeout,
-            json=json,
+            data=_json_body(json),
             **kwargs,
         )
     except Exception as error:
@@ -79,7 +156,7 @@ def prefect_post(endpoint: str, json: dict, **kwargs) -> dict:
     except Exception as error:
         logger.exception(error)
         raise HttpError(res.status_code, res.text) from error
-    return res.json()
+    return _json_response(res)
 
 
 def prefect_put(endpoint: str, json: dict, **kwargs) -> dict:
@@ -87,14 +164,66 @@ def prefect_put(endpoint: str, json: dict, **kwargs) -> dict:
     # we send headers and timeout separately from kwargs, just to be explicit about it
     headers = kwargs.pop("headers", {})
     headers["x-ddp-org"] = logger.get_slug()
+    headers["Content-Type"] = "application/json"
+    timeout = kwargs.pop("timeout", http_timeout)
+
+    try:
+        res = http_session.put(
+            f"{PREFECT_PROXY_API_URL}/proxy/{endpoint}",
+            headers=headers,
+            timeout=timeout,
+            data=_json_body(json),
+            **kwargs,
+        )
+    except Exception as error:
+        raise HttpError(500, "connection error") from error
+    try:
+        res.raise_for_status()
+    except Exception as error:
+        logger.exception(error)
+        raise HttpError(res.status_code, res.text) from error
+    return _json_response(res)
+
+
+async def aprefect_get(client: httpx.AsyncClient, endpoint: str, **kwargs) -> dict:
+    """
+    make a GET request to the proxy from a coroutine, to fan out several calls concurrently
+    the caller owns the client, and passes the x-ddp-org header in since the org can't be
+    looked up from inside the event loop
+    """
+    headers = kwargs.pop("headers", {})
+    timeout = kwargs.pop("timeout", http_timeout)
+
+    try:
+        res = await client.get(
+            f"{PREFECT_PROXY_API_URL}/proxy/{endpoint}",
+            headers=headers,
+            timeout=timeout,
+            **kwargs,
+        )
+    except Exception as error:
+        raise HttpError(500, "connection error") from error
+    try:
+        res.raise_for_status()
+    except Exception as error:
+        logger.exception(error)
+        raise HttpError(res.status_code, res.text) from error
+    return _json_response(res)
+
+
+async def aprefect_post(
+    client: httpx.AsyncClient, endpoint: str, json: dict, **kwargs
+) -> dict:
+    """make a POST request to the proxy from a coroutine; see aprefect_get"""
+    headers = {**kwargs.pop("headers", {}), "Content-Type": "application/json"}
     timeout = kwargs.pop("timeout", http_timeout)
 
     try:
-        res = requests.put(
+        res = await client.post(
             f"{PREFECT_PROXY_API_URL}/proxy/{endpoint}",
             headers=headers,
             timeout=timeout,
-            json=json,
+            content=_json_body(json),
             **kwargs,
         )
     except Exception as error:
@@ -104,7 +233,104 @@ def prefect_put(endpoint: str, json: dict, **kwargs) -> dict:
     except Exception as error:
         logger.exception(error)
         raise HttpError(res.status_code, res.text) from error
-    return res.json()
+    return _json_response(res)
+
+
+async def ahedged_prefect_get(
+    client: httpx.AsyncClient,
+    endpoint: str,
+    latencies: deque,
+    connection_slots: asyncio.Semaphore,
+    **kwargs,
+) -> dict:
+    """
+    aprefect_get for reads on a user's critical path; if the call takes longer than the p95
+    of the recent latencies, the same request is sent again and the first to succeed wins
+    connection_slots bounds the requests in flight on the client; the time spent waiting for
+    a slot is not counted, and a call is hedged only if a slot is free and the process is
+    below MAX_OUTSTANDING_HEDGES
+    never use this for writes
+    """
+    hedge_after = HEDGE_AFTER
+    if len(latencies) >= HEDGE_MIN_SAMPLES:
+        # snapshot, other threads of the process append to the same deque
+        hedge_after = statistics.quantiles(list(latencies), n=20)[-1]
+
+    async with connection_slots:
+        start = time.monotonic()
+        call = asyncio.ensure_future(aprefect_get(client, endpoint, **kwargs))
+        done, _ = await asyncio.wait({call}, timeout=hedge_after)
+        if (
+            not done
+            and not connection_slots.locked()
+            and hedge_slots.acquire(blocking=False)
+        ):
+            try:
+                async with connection_slots:
+                    hedge = asyncio.ensure_future(
+                        aprefect_get(client, endpoint, **kwargs)
+                    )
+                    # the first call to succeed wins; a call that fails waits for the other
+                    done, pending = set(), {call, hedge}
+                    while pending:
+                        finished, pending = await asyncio.wait(
+                            pending, return_when=asyncio.FIRST_COMPLETED
+                        )
+                        done |= finished
+                        if any(task.exception() is None for task in finished):
+                            break
+                    for pending_call in pending:
+                        pending_call.cancel()
+                    await asyncio.gather(*pending, return_exceptions=True)
+            finally:
+                hedge_slots.release()
+        elif not done:
+            done, _ = await asyncio.wait({call})
+
+        succeeded = [task for task in done if task.exception() is None]
+        if not succeeded:
+            # both calls failed, raise the error of the original one
+            return call.result()
+        latencies.append(time.monotonic() - start)
+    return succeeded[0].result()
+
+
+def prefect_get_concurrently(
+    endpoints: list[str], hedge_latencies: deque = None, **kwargs
+) -> list[dict]:
+    """
+    make GET requests to several proxy endpoints at once over one connection pool;
+    returns the responses in the order of the endpoints
+    with hedge_latencies the requests are hedged, see ahedged_prefect_get
+    """
+    headers = {"x-ddp-org": logger.get_slug()}
+
+    async def get_all():
+        # the client is scoped to this event loop, async_to_sync runs a new one each time
+        async with httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=MAX_CONCURRENT_REQUESTS)
+        ) as client:
+            if hedge_latencies is None:
+                calls = [
+                    aprefect_get(client, endpoint, headers=headers, **kwargs)
+                    for endpoint in endpoints
+                ]
+            else:
+                connection_slots = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+                calls = [
+                    ahedged_prefect_get(
+                        client,
+                        endpoint,
+                        hedge_latencies,
+                        connection_slots,
+                        headers=headers,
+                        **kwargs,
+                    )
+                    for endpoint in endpoints
+                ]
+            return await asyncio.gather(*calls)
+
+    return async_to_sync(get_all)()
 
 
 def prefect_delete_a_block(block_id: str, **kwargs) -> None:
@@ -115,7 +341,30 @@ def prefect_delete_a_block(block_id: str, **kwargs) -> None:
     timeout = kwargs.pop("timeout", http_timeout)
 
     try:
-        res = requests.delete(
+        res = http_session.delete(
+            f"{PREFECT_PROXY_API_URL}/delete-a-block/{block_id}",
+            headers=headers,
+            timeout=timeout,
+            **kwargs,
+        )
+    except Exception as error:
+        raise HttpError(500, "connection error") from error
+    try:
+        res.raise_for_status()
+    except Exception as error:
+        logger.exception(error)
+        raise HttpError(res.status_code, res.text) from error
+
+
+async def aprefect_delete_a_block(
+    client: httpx.AsyncClient, block_id: str, **kwargs
+) -> None:
+    """make a DELETE request to the proxy from a coroutine; see aprefect_get"""
+    headers = kwargs.pop("headers", {})
+    timeout = kwargs.pop("timeout", http_timeout)
+
+    try:
+        res = await client.delete(
             f"{PREFECT_PROXY_API_URL}/delete-a-block/{block_id}",
             headers=headers,
             timeout=timeout,
@@ -130,6 +379,30 @@ def prefect_delete_a_block(block_id: str, **kwargs) -> None:
         raise HttpError(res.status_code, res.text) from error
 
 
+def prefect_delete_blocks_concurrently(block_ids: list[str]) -> list:
+    """
+    delete several independent blocks at once; returns the error for each block id in order,
+    None where the delete succeeded, so that the caller decides what a failure means
+    """
+    if len(block_ids) == 0:
+        return []
+    headers = {"x-ddp-org": logger.get_slug()}
+
+    async def delete_all():
+        async with httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=MAX_CONCURRENT_REQUESTS)
+        ) as client:
+            return await asyncio.gather(
+                *[
+                    aprefect_delete_a_block(client, block_id, headers=headers)
+                    for block_id in block_ids
+                ],
+                return_exceptions=True,
+            )
+
+    return async_to_sync(delete_all)()
+
+
 # ================================================================================================
 def get_airbyte_server_block_id(blockname) -> str | None:
     """get the block_id for the server block having this name"""
@@ -141,12 +414,7 @@ def create_airbyte_server_block(blockname):
     """Create airbyte server block in prefect"""
     response = prefect_post(
         "blocks/airbyte/server/",
-        {
-            "blockName": blockname,
-            "serverHost": os.getenv("AIRBYTE_SERVER_HOST"),
-            "serverPort": os.getenv("AIRBYTE_SERVER_PORT"),
-            "apiVersion": os.getenv("AIRBYTE_SERVER_APIVER"),
-        },
+        {"blockName": blockname, **AIRBYTE_SERVER_BLOCK_CONFIG},
     )
     return (response["block_id"], response["cleaned_block_name"])
 
@@ -331,21 +599,35 @@ def create_dbt_cli_profile_block(
     """Create a dbt cli profile block in that has the warehouse information"""
     response = prefect_post(
         "blocks/dbtcli/profile/",
-        {
-            "cli_profile_block_name": block_name,
-            "profile": {
-                "name": profilename,
-                "target": target,
-                "target_configs_schema": target,
-            },
-            "wtype": wtype,
-            "credentials": credentials,
-            "bqlocation": bqlocation,
-        },
+        _dbt_cli_profile_block_payload(
+            block_name, profilename, target, wtype, bqlocation, credentials
+        ),
     )
     return response
 
 
+def _dbt_cli_profile_block_payload(
+    block_name: str,
+    profilename: str,
+    target: str,
+    wtype: str,
+    bqlocation: str,
+    credentials: dict,
+) -> dict:
+    """request body to create a dbt cli profile block"""
+    return {
+        "cli_profile_block_name": block_name,
+        "profile": {
+            "name": profilename,
+            "target": target,
+            "target_configs_schema": target,
+        },
+        "wtype": wtype,
+        "credentials": credentials,
+        "bqlocation": bqlocation,
+    }
+
+
 def update_dbt_cli_profile_block(
     block_name: str,
     wtype: str = None,
@@ -397,6 +679,77 @@ def create_secret_block(secret_block: PrefectSecretBlockCreate):
     return response
 
 
+def create_secret_and_dbt_cli_profile_blocks(
+    secret_block: PrefectSecretBlockCreate | None,
+    cli_block_name: str,
+    profilename: str,
+    target: str,
+    wtype: str,
+    bqlocation: str,
+    credentials: dict,
+) -> tuple[dict | None, dict]:
+    """
+    creates the git pull secret block (if there is one) and the dbt cli profile block
+    concurrently, the two don't depend on each other
+    if either fails the other one is deleted again before the error is raised, so that
+    no block is left in prefect without an OrgPrefectBlockv1
+    returns the responses for the secret block and the cli profile block
+    """
+    headers = {"x-ddp-org": logger.get_slug()}
+
+    async def create_blocks():
+        # the client is scoped to this event loop, async_to_sync runs a new one each time
+        async with httpx.AsyncClient() as client:
+            requests_to_proxy = [
+                aprefect_post(
+                    client,
+                    "blocks/dbtcli/profile/",
+                    _dbt_cli_profile_block_payload(
+                        cli_block_name,
+                        profilename,
+                        target,
+                        wtype,
+                        bqlocation,
+                        credentials,
+                    ),
+                    headers=headers,
+                )
+            ]
+            if secret_block is not None:
+                requests_to_proxy.append(
+                    aprefect_post(
+                        client,
+                        "blocks/secret/",
+                        {
+                            "blockName": secret_block.block_name,
+                            "secret": secret_block.secret,
+                        },
+                        headers=headers,
+                    )
+                )
+            responses = await asyncio.gather(*requests_to_proxy, return_exceptions=True)
+            errors = [
+                response for response in responses if isinstance(response, Exception)
+            ]
+            if len(errors) > 0:
+                for response in responses:
+                    if isinstance(response, Exception):
+                        continue
+                    try:
+                        await aprefect_delete_a_block(
+                            client, response["block_id"], headers=headers
+                        )
+                    except Exception as error:  # pylint:disable=broad-exception-caught
+                        logger.exception(error)
+                raise errors[0]
+            return responses
+
+    responses = async_to_sync(create_blocks)()
+    cli_block_response = responses[0]
+    secret_block_response = responses[1] if secret_block is not None else None
+    return secret_block_response, cli_block_response
+
+
 def delete_secret_block(block_id) -> None:
     """Delete secret block in prefect"""
     prefect_delete_a_block(block_id)
@@ -513,44 +866,157 @@ def update_dataflow_v1(
     return res
 
 
-def get_flow_runs_by_deployment_id(deployment_id: str, limit=None):  # pragma: no cover
-    """
-    Fetch flow runs of a deployment that are FAILED/COMPLETED
-    sorted by descending start time of each run
-    """
-    result = []
-    # sorted by start-time ASC
-    for prefect_flow_run in PrefectFlowRun.objects.filter(
-        deployment_id=deployment_id
-    ).order_by("start_time"):
-        result.append(prefect_flow_run.to_json())
+MAX_FLOW_RUNS_BY_DEPLOYMENT = 50
+
+# the columns of PrefectFlowRun read by get_flow_runs_by_deployment_id
+STORED_FLOW_RUN_FIELDS = (
+    "deployment_id",
+    "flow_run_id",
+    "name",
+    "start_time",
+    "expected_start_time",
+    "total_run_time",
+    "status",
+    "state_name",
+)
+
+
+def _stored_flow_run_json(
+    deployment_id,
+    flow_run_id,
+    name,
+    start_time,
+    expected_start_time,
+    total_run_time,
+    status,
+    state_name,
+) -> dict:
+    """same as PrefectFlowRun.to_json, from a row of STORED_FLOW_RUN_FIELDS"""
+    return {
+        "deployment_id": deployment_id,
+        "id": flow_run_id,
+        "name": name,
+        "startTime": start_time.isoformat(),
+        "expectedStartTime": expected_start_time.isoformat(),
+        "totalRunTime": total_run_time,
+        "status": status,
+        "state_name": state_name,
+    }
+
+
+def _stored_flow_runs(deployment_id: str) -> list[dict]:
+    """the most recent stored flow runs of a deployment, sorted by start-time DESC"""
+    # only the most recent stored runs can be returned, project them straight
+    # to dicts instead of building a model instance per row
+    return [
+        _stored_flow_run_json(*row)
+        for row in PrefectFlowRun.objects.filter(deployment_id=deployment_id)
+        .order_by("-start_time")
+        .values_list(*STORED_FLOW_RUN_FIELDS)[:MAX_FLOW_RUNS_BY_DEPLOYMENT]
+    ]
+
 
+def _flow_runs_params(deployment_id: str, limit, stored_flow_runs: list[dict]) -> dict:
+    """query parameters to fetch the flow runs of a deployment newer than the stored ones"""
     params = {"deployment_id": deployment_id, "limit": limit}
-    if len(result) > 0:
-        params["start_time_gt"] = result[-1]["startTime"]
-    res = prefect_get("flow_runs", params=params, timeout=60)
+    if len(stored_flow_runs) > 0:
+        params["start_time_gt"] = stored_flow_runs[0]["startTime"]
+    return params
+
+
+def _merge_new_flow_runs(
+    deployment_id: str, stored_flow_runs: list[dict], flow_runs: list[dict]
+) -> list[dict]:
+    """
+    stores the flow runs fetched from prefect which we haven't seen before
+    returns them together with the stored ones, sorted by start-time DESC
+    """
+    # the flow runs we have already stored, in one query
+    stored_flow_run_ids = set(
+        PrefectFlowRun.objects.filter(
+            flow_run_id__in=[flow_run["id"] for flow_run in flow_runs]
+        ).values_list("flow_run_id", flat=True)
+    )
 
     # iterate so that start-time is ASC
-    for flow_run in res["flow_runs"][::-1]:
-        if not PrefectFlowRun.objects.filter(flow_run_id=flow_run["id"]).exists():
-            if flow_run["startTime"] in ["", None]:
-                flow_run["startTime"] = flow_run["expectedStartTime"]
-            prefect_flow_run = PrefectFlowRun.objects.create(
+    new_flow_runs = []
+    for flow_run in flow_runs[::-1]:
+        if flow_run["id"] in stored_flow_run_ids:
+            continue
+        stored_flow_run_ids.add(flow_run["id"])
+        if flow_run["startTime"] in ["", None]:
+            flow_run["startTime"] = flow_run["expectedStartTime"]
+        new_flow_runs.append(
+            PrefectFlowRun(
                 deployment_id=deployment_id,
                 flow_run_id=flow_run["id"],
                 name=flow_run["name"],
-                start_time=flow_run["startTime"],
-                expected_start_time=flow_run["expectedStartTime"],
+                start_time=as_utc(parse_datetime(flow_run["startTime"])),
+                expected_start_time=as_utc(
+                    parse_datetime(flow_run["expectedStartTime"])
+                ),
                 total_run_time=flow_run["totalRunTime"],
                 status=flow_run["status"],
                 state_name=flow_run["state_name"],
             )
-            prefect_flow_run.refresh_from_db()
-            result.append(prefect_flow_run.to_json())
+        )
 
+    # insert them together; the datetimes are already parsed so to_json works without a refresh
+    PrefectFlowRun.objects.bulk_create(new_flow_runs)
+
+    # the new runs are all more recent than the stored ones
     # sorted by start-time DESC
-    result.reverse()
-    return result[:50]
+    result = [
+        prefect_flow_run.to_json() for prefect_flow_run in reversed(new_flow_runs)
+    ] + stored_flow_runs
+    result = result[:MAX_FLOW_RUNS_BY_DEPLOYMENT]
+    _record_flow_runs_finished_at(result)
+    return result
+
+
+def get_flow_runs_by_deployment_id(deployment_id: str, limit=None):  # pragma: no cover
+    """
+    Fetch flow runs of a deployment that are FAILED/COMPLETED
+    sorted by descending start time of each run
+    """
+    stored_flow_runs = _stored_flow_runs(deployment_id)
+    res = prefect_get(
+        "flow_runs",
+        params=_flow_runs_params(deployment_id, limit, stored_flow_runs),
+        timeout=60,
+    )
+    return _merge_new_flow_runs(deployment_id, stored_flow_runs, res["flow_runs"])
+
+
+def get_flow_runs_by_deployment_ids(deployment_ids: list[str], limit=None) -> dict:
+    """
+    same as get_flow_runs_by_deployment_id for several deployments, keyed by deployment id;
+    the proxy filters flow runs by a single deployment so they are fetched concurrently
+    """
+    deployment_ids = list(dict.fromkeys(deployment_ids))
+    if len(deployment_ids) == 0:
+        return {}
+
+    stored_flow_runs = {
+        deployment_id: _stored_flow_runs(deployment_id)
+        for deployment_id in deployment_ids
+    }
+    endpoints = []
+    for deployment_id in deployment_ids:
+        params = _flow_runs_params(
+            deployment_id, limit, stored_flow_runs[deployment_id]
+        )
+        # requests drops the None-valued params, do the same here
+        query = urlencode({key: val for key, val in params.items() if val is not None})
+        endpoints.append(f"flow_runs?{query}")
+    responses = prefect_get_concurrently(endpoints, timeout=60)
+
+    return {
+        deployment_id: _merge_new_flow_runs(
+            deployment_id, stored_flow_runs[deployment_id], res["flow_runs"]
+        )
+        for deployment_id, res in zip(deployment_ids, responses)
+    }
 
 
 def get_last_flow_run_by_deployment_id(deployment_id: str):  # pragma: no cover
@@ -561,17 +1027,36 @@ def get_last_flow_run_by_deployment_id(deployment_id: str):  # pragma: no cover
     return None
 
 
+def get_last_flow_runs_by_deployment_ids(deployment_ids: list[str]) -> dict:
+    """most recent FAILED/COMPLETED flow run of each deployment, keyed by deployment id"""
+    return {
+        deployment_id: flow_runs[0] if len(flow_runs) > 0 else None
+        for deployment_id, flow_runs in get_flow_runs_by_deployment_ids(
+            deployment_ids, limit=1
+        ).items()
+    }
+
+
 def set_deployment_schedule(deployment_id: str, status: str):
     """activates / deactivates a deployment"""
     prefect_post(f"deployments/{deployment_id}/set_schedule/{status}", {})
 
 
-def get_filtered_deployments(org_slug, deployment_ids):  # pragma: no cover
-    # pylint: disable=dangerous-default-value
-    """Fetch all deployments by org slug"""
+# the pipeline list polls this filter, only the org and the deployment ids vary
+DEPLOYMENTS_FILTER_BODY = b'{"org_slug":%s,"deployment_ids":%s}'
+
+
+def get_filtered_deployments(
+    org_slug, deployment_ids: list
+) -> list:  # pragma: no cover
+    """Fetch these deployments of the org"""
+    if len(deployment_ids) == 0:
+        # e.g. an org without pipelines, there is nothing for prefect to filter
+        return []
     res = prefect_post(
         "deployments/filter",
-        {"org_slug": org_slug, "deployment_ids": deployment_ids},
+        DEPLOYMENTS_FILTER_BODY
+        % (orjson.dumps(org_slug), orjson.dumps(deployment_ids)),
     )
     return res["deployments"]
 
@@ -579,7 +1064,7 @@ def get_filtered_deployments(org_slug, deployment_ids):  # pragma: no cover
 def delete_deployment_by_id(deployment_id: str) -> dict:  # pragma: no cover
     """Proxy api call to delete a deployment from prefect db"""
     try:
-        res = requests.delete(
+        res = http_session.delete(
             f"{PREFECT_PROXY_API_URL}/proxy/deployments/{deployment_id}",
             timeout=http_timeout,
         )
@@ -597,19 +1082,160 @@ def get_deployment(deployment_id) -> dict:
 
 def get_flow_run_logs(flow_run_id: str, offset: int) -> dict:  # pragma: no cover
     """retreive the logs from a flow-run from prefect"""
-    res = prefect_get(
-        f"flow_runs/logs/{flow_run_id}",
-        params={"offset": offset},
-    )
+    res = cache.get(_flow_run_logs_cache_key(flow_run_id, offset))
+    if res is None:
+        res = prefect_get(
+            f"flow_runs/logs/{flow_run_id}",
+            params={"offset": offset},
+        )
+        _cache_flow_run_logs_if_terminal({flow_run_id: res}, offset)
     return {"logs": res}
 
 
+def get_flow_runs_logs_by_ids(flow_run_ids: list[str], offset: int = 0) -> dict:
+    """
+    retrieve the logs of several flow-runs from prefect concurrently, keyed by flow-run id;
+    each value has the same shape as get_flow_run_logs
+    """
+    flow_run_ids = set(flow_run_ids)
+    if len(flow_run_ids) == 0:
+        return {}
+
+    cached = cache.get_many(
+        [_flow_run_logs_cache_key(flow_run_id, offset) for flow_run_id in flow_run_ids]
+    )
+    logs_map = {
+        flow_run_id: cached[_flow_run_logs_cache_key(flow_run_id, offset)]
+        for flow_run_id in flow_run_ids
+        if _flow_run_logs_cache_key(flow_run_id, offset) in cached
+    }
+    flow_run_ids = [
+        flow_run_id for flow_run_id in flow_run_ids if flow_run_id not in logs_map
+    ]
+
+    if len(flow_run_ids) > 0:
+        results = prefect_get_concurrently(
+            [f"flow_runs/logs/{flow_run_id}" for flow_run_id in flow_run_ids],
+            hedge_latencies=flow_run_logs_latencies,
+            params={"offset": offset},
+        )
+        fetched = dict(zip(flow_run_ids, results))
+        _cache_flow_run_logs_if_terminal(fetched, offset)
+        logs_map.update(fetched)
+
+    return {flow_run_id: {"logs": res} for flow_run_id, res in logs_map.items()}
+
+
+def _flow_run_logs_cache_key(flow_run_id: str, offset: int) -> str:
+    """cache key for a page of logs of a finished flow run"""
+    return f"flowrunlogs-{flow_run_id}-{offset}"
+
+
+def _cache_flow_run_logs_if_terminal(logs_map: dict, offset: int) -> None:
+    """
+    cache pages of logs {flow_run_id: logs} of flow runs which are known to have finished
+    at least FLOW_RUN_LOGS_GRACE_PERIOD ago; the logs of a running flow run keep growing,
+    and those of one which has just finished may still be missing their last lines
+    """
+    finished_at = cache.get_many(
+        [_flow_run_finished_at_cache_key(flow_run_id) for flow_run_id in logs_map]
+    )
+    now = time.time()
+    cache.set_many(
+        {
+            _flow_run_logs_cache_key(flow_run_id, offset): logs
+            for flow_run_id, logs in logs_map.items()
+            if _flow_run_finished_at_cache_key(flow_run_id) in finished_at
+            and now - finished_at[_flow_run_finished_at_cache_key(flow_run_id)]
+            >= FLOW_RUN_LOGS_GRACE_PERIOD
+        },
+        timeout=FLOW_RUN_LOGS_CACHE_TIMEOUT,
+    )
+
+
+def _flow_run_cache_key(flow_run_id: str) -> str:
+    """cache key for a finished flow run"""
+    return f"flowrun-{flow_run_id}"
+
+
+def _flow_run_finished_at_cache_key(flow_run_id: str) -> str:
+    """cache key for when we first saw a flow run in a terminal state"""
+    return f"flowrunfinishedat-{flow_run_id}"
+
+
+def _cache_flow_run_if_terminal(flow_run_id: str, flow_run: dict) -> None:
+    """cache a flow run once it has reached a terminal state"""
+    if flow_run and flow_run.get("state_type") in FLOW_RUN_TERMINAL_STATE_TYPES:
+        cache.set(
+            _flow_run_cache_key(flow_run_id), flow_run, timeout=FLOW_RUN_CACHE_TIMEOUT
+        )
+        # add, so that a flow run cached again keeps the time it was first seen finished
+        cache.add(
+            _flow_run_finished_at_cache_key(flow_run_id),
+            time.time(),
+            timeout=FLOW_RUN_CACHE_TIMEOUT,
+        )
+
+
+def _record_flow_runs_finished_at(flow_runs: list[dict]) -> None:
+    """
+    record when the terminal runs of a deployment's flow run listing finished, so that
+    their logs can be cached when they are fetched right after; a run finished its
+    total run time after it started
+    """
+    for flow_run in flow_runs:
+        if flow_run["status"] in FLOW_RUN_TERMINAL_STATE_TYPES:
+            cache.add(
+                _flow_run_finished_at_cache_key(flow_run["id"]),
+                parse_datetime(flow_run["startTime"]).timestamp()
+                + flow_run["totalRunTime"],
+                timeout=FLOW_RUN_CACHE_TIMEOUT,
+            )
+
+
 def get_flow_run(flow_run_id: str) -> dict:
     """retreive the logs from a flow-run from prefect"""
+    res = cache.get(_flow_run_cache_key(flow_run_id))
+    if res is not None:
+        return res
     res = prefect_get(f"flow_runs/{flow_run_id}")
+    _cache_flow_run_if_terminal(flow_run_id, res)
     return res
 
 
+def get_flow_runs_by_ids(flow_run_ids: list[str]) -> dict:
+    """
+    retrieve several flow-runs from prefect concurrently, keyed by flow-run id;
+    each id is fetched once
+    """
+    flow_run_ids = set(flow_run_ids)
+    if len(flow_run_ids) == 0:
+        return {}
+
+    # finished flow runs come from the cache, only the rest go to prefect
+    cached = cache.get_many(
+        [_flow_run_cache_key(flow_run_id) for flow_run_id in flow_run_ids]
+    )
+    flow_run_map = {
+        flow_run_id: cached[_flow_run_cache_key(flow_run_id)]
+        for flow_run_id in flow_run_ids
+        if _flow_run_cache_key(flow_run_id) in cached
+    }
+    flow_run_ids = [
+        flow_run_id for flow_run_id in flow_run_ids if flow_run_id not in flow_run_map
+    ]
+    if len(flow_run_ids) == 0:
+        return flow_run_map
+
+    flow_runs = prefect_get_concurrently(
+        [f"flow_runs/{flow_run_id}" for flow_run_id in flow_run_ids]
+    )
+    for flow_run_id, flow_run in zip(flow_run_ids, flow_runs):
+        _cache_flow_run_if_terminal(flow_run_id, flow_run)
+        flow_run_map[flow_run_id] = flow_run
+    return flow_run_map
+
+
 def create_deployment_flow_run(
     deployment_id: str, flow_run_params: dict = None
 ) -> dict:  # pragma: no cover
@@ -640,9 +1266,14 @@ def lock_blocks_for_deployment(deployment_id: str, orguser: OrgUser):
         )
 
     locks = []
+    # a block can appear more than once in a deployment but can only be locked once
+    locked_opb_ids = set()
     try:
         with transaction.atomic():
             for df_block in dataflow_blocks:
+                if df_block.opb_id in locked_opb_ids:
+                    continue
+                locked_opb_ids.add(df_block.opb_id)
                 blocklock = BlockLock.objects.create(
                     opb=df_block.opb, locked_by=orguser
                 )
@@ -660,8 +1291,13 @@ def lock_tasks_for_deployment(deployment_id: str, orguser: OrgUser):
         dataflow__deployment_id=deployment_id
     ).all()
 
-    orgtask_ids = [df_orgtask.orgtask.id for df_orgtask in dataflow_orgtasks]
-    lock = TaskLock.objects.filter(orgtask_id__in=orgtask_ids).first()
+    # read the foreign keys off the mapping instead of loading each orgtask for its id
+    orgtask_ids = [df_orgtask.orgtask_id for df_orgtask in dataflow_orgtasks]
+    lock = (
+        TaskLock.objects.select_related("locked_by__user")
+        .filter(orgtask_id__in=orgtask_ids)
+        .first()
+    )
     if lock:
         logger.info(f"{lock.locked_by.user.email} is running this pipeline right now")
         raise HttpError(
@@ -669,13 +1305,18 @@ def lock_tasks_for_deployment(deployment_id: str, orguser: OrgUser):
         )
 
     locks = []
+    # an orgtask can appear more than once in a pipeline but can only be locked once
+    locked_orgtask_ids = set()
     try:
         with transaction.atomic():
             for df_orgtask in dataflow_orgtasks:
+                if df_orgtask.orgtask_id in locked_orgtask_ids:
+                    continue
+                locked_orgtask_ids.add(df_orgtask.orgtask_id)
                 task_lock = TaskLock.objects.create(
-                    orgtask=df_orgtask.orgtask,
+                    orgtask_id=df_orgtask.orgtask_id,
                     locked_by=orguser,
-                    locking_dataflow=df_orgtask.dataflow,
+                    locking_dataflow_id=df_orgtask.dataflow_id,
                 )
                 locks.append(task_lock)
     except Exception as error:
@@ -0,0 +1,22 @@
+# Generated by Django 4.1.7 on 2026-10-14 03:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ddpui", "0070_org_ses_whitelisted_email"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="orgprefectblockv1",
+            index=models.Index(
+                condition=models.Q(
+                    ("block_name__contains", "git-pull"), ("block_type", "Secret")
+                ),
+                fields=["org"],
+                name="idx_orgblock_gitpull",
+            ),
+        ),
+    ]
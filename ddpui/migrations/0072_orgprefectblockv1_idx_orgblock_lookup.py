@@ -0,0 +1,18 @@
+# Generated by Django 4.1.7 on 2026-10-14 05:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ddpui", "0071_orgprefectblockv1_idx_orgblock_gitpull"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="orgprefectblockv1",
+            index=models.Index(
+                fields=["org", "block_type", "block_name"], name="idx_orgblock_lookup"
+            ),
+        ),
+    ]
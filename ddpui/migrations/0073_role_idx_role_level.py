@@ -0,0 +1,16 @@
+# Generated by Django 4.1.7 on 2026-10-14 05:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ddpui", "0072_orgprefectblockv1_idx_orgblock_lookup"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="role",
+            index=models.Index(fields=["level"], name="idx_role_level"),
+        ),
+    ]
@@ -2,6 +2,8 @@ from enum import Enum
 from django.db import models
 from ninja import Schema
 
+from ddpui.ddpprefect import SECRET
+
 
 class OrgVizLoginType(str, Enum):
     """an enum for roles assignable to org-users"""
@@ -187,6 +189,20 @@ class OrgPrefectBlockv1(models.Model):
         max_length=100, unique=True
     )  # use blockname to distinguish between different dbt commands
 
+    class Meta:
+        indexes = [
+            # blocks are almost always looked up by org and type
+            models.Index(
+                fields=["org", "block_type", "block_name"], name="idx_orgblock_lookup"
+            ),
+            # partial index for the git-pull secret block lookup when building pipelines
+            models.Index(
+                fields=["org"],
+                condition=models.Q(block_type=SECRET, block_name__contains="git-pull"),
+                name="idx_orgblock_gitpull",
+            ),
+        ]
+
     def __str__(self) -> str:
         return f"OrgPrefectBlock[{self.org.name}|{self.block_type}|{self.block_name}]"
 
@@ -10,6 +10,12 @@ class Role(models.Model):
     name = models.CharField(max_length=255)
     level = models.SmallIntegerField(default=1)  # keep the lowest role as default
 
+    class Meta:
+        indexes = [
+            # roles are filtered by level to find the ones an orguser can assign
+            models.Index(fields=["level"], name="idx_role_level"),
+        ]
+
     def __str__(self):
         return f"{self.name} | {self.slug} | {self.level}"
 
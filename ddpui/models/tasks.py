@@ -77,12 +77,14 @@ class OrgTask(models.Model):
         returns the command line parameters for this task
         """
         retval = self.task.command
-        if self.flags():
-            for flag in self.flags():
-                retval += " --" + flag
-        if self.options():
-            for optname, optval in self.options().items():
-                retval += f" --{optname} {optval}"
+        flags = self.flags()
+        if flags:
+            retval += "".join(f" --{flag}" for flag in flags)
+        options = self.options()
+        if options:
+            retval += "".join(
+                f" --{optname} {optval}" for optname, optval in options.items()
+            )
         return retval
 
 
@@ -213,11 +213,14 @@ def test_get_airbyte_connections_v1_without_workspace(orguser):
 )
 @patch.multiple(
     "ddpui.ddpprefect.prefect_service",
-    get_last_flow_run_by_deployment_id=Mock(
-        return_value={
-            "flow-run-id": "00000",
-            "startTime": 0,
-            "expectedStartTime": 0,
+    get_last_flow_runs_by_deployment_ids=Mock(
+        side_effect=lambda deployment_ids: {
+            deployment_id: {
+                "flow-run-id": "00000",
+                "startTime": 0,
+                "expectedStartTime": 0,
+            }
+            for deployment_id in deployment_ids
         }
     ),
 )
@@ -54,9 +54,9 @@ def test_get_dashboard():
     BlockLock.objects.create(opb=opb, locked_by=orguser)
 
     with patch(
-        "ddpui.api.dashboard_api.prefect_service.get_flow_runs_by_deployment_id"
-    ) as mock_get_flow_runs_by_deployment_id:
-        mock_get_flow_runs_by_deployment_id.return_value = []
+        "ddpui.api.dashboard_api.prefect_service.get_flow_runs_by_deployment_ids"
+    ) as mock_get_flow_runs_by_deployment_ids:
+        mock_get_flow_runs_by_deployment_ids.return_value = {"deployment-id": []}
         result = get_dashboard(request)
 
     assert result[0]["name"] == "flow-name"
@@ -93,9 +93,9 @@ def test_get_dashboard_v1():
     TaskLock.objects.create(orgtask=orgtask, locked_by=orguser)
 
     with patch(
-        "ddpui.api.dashboard_api.prefect_service.get_flow_runs_by_deployment_id"
-    ) as mock_get_flow_runs_by_deployment_id:
-        mock_get_flow_runs_by_deployment_id.return_value = []
+        "ddpui.api.dashboard_api.prefect_service.get_flow_runs_by_deployment_ids"
+    ) as mock_get_flow_runs_by_deployment_ids:
+        mock_get_flow_runs_by_deployment_ids.return_value = {"deployment-id": []}
         result = get_dashboard_v1(request)
 
     assert result[0]["name"] == "flow-name"
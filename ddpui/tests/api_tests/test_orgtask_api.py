@@ -19,7 +19,7 @@ from ddpui.api.orgtask_api import (
     post_system_transformation_tasks,
     post_run_prefect_org_task,
 )
-from ddpui.ddpprefect import DBTCLIPROFILE, SECRET
+from ddpui.ddpprefect import DBTCLIPROFILE, SECRET, prefect_service
 from ddpui.models.org import Org, OrgDbt, OrgPrefectBlockv1, OrgWarehouse
 from ddpui.models.role_based_access import Role, RolePermission, Permission
 from ddpui.models.org_user import OrgUser, OrgUserRole
@@ -255,11 +255,11 @@ def test_post_system_transformation_tasks_warehouse_not_setup(orguser_dbt_worksp
 )
 @patch.multiple(
     "ddpui.ddpprefect.prefect_service",
-    create_secret_block=Mock(
-        return_value={"block_id": "git-secret-blk", "block_name": "git-secret-blk"}
-    ),
-    create_dbt_cli_profile_block=Mock(
-        return_value={"block_id": "cli-blk-id", "block_name": "cli-blk-name"}
+    create_secret_and_dbt_cli_profile_blocks=Mock(
+        return_value=(
+            {"block_id": "git-secret-blk", "block_name": "git-secret-blk"},
+            {"block_id": "cli-blk-id", "block_name": "cli-blk-name"},
+        )
     ),
     create_dataflow_v1=Mock(
         return_value={
@@ -293,11 +293,11 @@ def test_post_system_transformation_tasks_success_postgres_warehouse(
 )
 @patch.multiple(
     "ddpui.ddpprefect.prefect_service",
-    create_secret_block=Mock(
-        return_value={"block_id": "git-secret-blk", "block_name": "git-secret-blk"}
-    ),
-    create_dbt_cli_profile_block=Mock(
-        return_value={"block_id": "cli-blk-id", "block_name": "cli-blk-name"}
+    create_secret_and_dbt_cli_profile_blocks=Mock(
+        return_value=(
+            {"block_id": "git-secret-blk", "block_name": "git-secret-blk"},
+            {"block_id": "cli-blk-id", "block_name": "cli-blk-name"},
+        )
     ),
     create_dataflow_v1=Mock(
         return_value={
@@ -335,8 +335,7 @@ def test_get_prefect_transformation_tasks_success(orguser_transform_tasks):
 
 @patch.multiple(
     "ddpui.ddpprefect.prefect_service",
-    delete_secret_block=Mock(return_value=True),
-    delete_dbt_cli_profile_block=Mock(return_value=True),
+    prefect_delete_blocks_concurrently=Mock(side_effect=lambda ids: [None] * len(ids)),
     delete_deployment_by_id=Mock(return_value=True),
 )
 def test_delete_system_transformation_tasks_success(orguser_transform_tasks):
@@ -363,6 +362,36 @@ def test_delete_system_transformation_tasks_success(orguser_transform_tasks):
     )
 
 
+@patch.multiple(
+    "ddpui.ddpprefect.prefect_service",
+    prefect_delete_blocks_concurrently=Mock(
+        return_value=[HttpError(400, "failed to delete"), None]
+    ),
+)
+def test_delete_system_transformation_tasks_block_failure(orguser_transform_tasks):
+    """tests DELETE /tasks/transform/ when one of the blocks fails to delete"""
+    request = mock_request(orguser_transform_tasks)
+    org = request.orguser.org
+
+    with pytest.raises(HttpError) as excinfo:
+        delete_system_transformation_tasks(request)
+    assert str(excinfo.value) == "failed to delete"
+
+    # both blocks (created by the fixture) are deleted from prefect together
+    prefect_service.prefect_delete_blocks_concurrently.assert_called_once_with(
+        ["secret-blk-id", "cliprofile-blk-id"]
+    )
+    # the block which could not be deleted from prefect is kept, the other one is gone
+    assert OrgPrefectBlockv1.objects.filter(
+        org=org, block_type=SECRET, block_id="secret-blk-id"
+    ).exists()
+    assert not OrgPrefectBlockv1.objects.filter(
+        org=org, block_type=DBTCLIPROFILE, block_id="cliprofile-blk-id"
+    ).exists()
+    # the orgtasks are not deleted after a failure
+    assert OrgTask.objects.filter(org=org, task__is_system=True).count() > 0
+
+
 def test_post_run_prefect_org_task_invalid_task_id(orguser_transform_tasks):
     """tests POST /tasks/{orgtask_uuid}/run/ failure by invalid task id"""
     request = mock_request(orguser_transform_tasks)
@@ -1,5 +1,5 @@
 import os, uuid
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
 import django
 import pytest
@@ -16,6 +16,7 @@ os.environ["DJANGO_ALLOW_ASYNC_UNSAFE"] = "true"
 django.setup()
 
 from django.contrib.auth.models import User
+from django.core.cache import cache
 
 from ddpui.api.pipeline_api import (
     post_run_prefect_org_deployment_task,
@@ -25,6 +26,7 @@ from ddpui.api.pipeline_api import (
     delete_prefect_dataflow_v1,
     put_prefect_dataflow_v1,
     post_deployment_set_schedule,
+    get_prefect_flow_runs_log_history,
 )
 from ddpui.ddpprefect import (
     DBTCLIPROFILE,
@@ -434,8 +436,11 @@ def test_get_prefect_dataflows_v1_success(orguser_transform_tasks):
             {"deploymentId": "test-dep-id-2", "isScheduleActive": False},
         ]
     ),
-    get_last_flow_run_by_deployment_id=Mock(
-        return_value="some-last-run-prefect-object"
+    get_last_flow_runs_by_deployment_ids=Mock(
+        side_effect=lambda deployment_ids: {
+            deployment_id: "some-last-run-prefect-object"
+            for deployment_id in deployment_ids
+        }
     ),
     create_dataflow_v1=Mock(
         return_value={"deployment": {"name": "test-deploy", "id": "test-deploy-id"}}
@@ -942,3 +947,35 @@ def test_post_run_prefect_org_deployment_task_success(orguser_transform_tasks):
     )
 
     assert TaskLock.objects.filter(orgtask=org_task).count() == 0
+
+
+@patch("ddpui.ddpprefect.prefect_service.aprefect_get", new_callable=AsyncMock)
+@patch("ddpui.ddpprefect.prefect_service.prefect_get")
+def test_get_prefect_flow_runs_log_history_caches_logs(
+    mock_get: Mock, mock_aget: AsyncMock, orguser_transform_tasks
+):
+    """the logs of flow runs which finished a while ago are fetched only once"""
+    cache.clear()
+    mock_get.return_value = {
+        "flow_runs": [
+            {
+                "id": "flowrunid",
+                "name": "flowrunname",
+                "startTime": "2021-01-01T00:00:00.000Z",
+                "expectedStartTime": "2021-01-01T00:00:00.000Z",
+                "totalRunTime": 10.0,
+                "status": "COMPLETED",
+                "state_name": "COMPLETED",
+            }
+        ]
+    }
+    mock_aget.return_value = {"logs": ["the-logs"]}
+    request = mock_request(orguser_transform_tasks)
+
+    for _ in range(2):
+        flow_runs = get_prefect_flow_runs_log_history(request, "deployment-id")
+        assert [flow_run["id"] for flow_run in flow_runs] == ["flowrunid"]
+        assert flow_runs[0]["logs"] == ["the-logs"]
+
+    mock_aget.assert_awaited_once()
+    cache.clear()
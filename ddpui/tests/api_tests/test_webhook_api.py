@@ -15,6 +15,7 @@ from ddpui.api.webhook_api import (
     get_message_type,
     get_flowrun_id_and_state,
     post_notification,
+    post_notification_v1,
 )
 from ddpui.utils.webhook_helpers import (
     get_org_from_flow_run,
@@ -162,7 +163,7 @@ def test_email_orgusers_not_to_report_viewers():
 
 def test_email_flowrun_logs_to_orgusers():
     """tests the email_flowrun_logs_to_orgusers function"""
-    org = Org.objects.create(name="temp", slug="temp")
+    org = Org.objects.create(name="temp", slug="temp", ses_whitelisted_email="orgemail")
     with patch(
         "ddpui.ddpprefect.prefect_service.get_flow_run_logs"
     ) as mock_get_flow_run_logs:
@@ -187,6 +188,19 @@ def test_email_flowrun_logs_to_orgusers():
             )
 
 
+def test_email_flowrun_logs_to_orgusers_no_recipients():
+    """the logs are not fetched when there is no one to email"""
+    org = Org.objects.create(name="temp", slug="temp")
+    with patch(
+        "ddpui.ddpprefect.prefect_service.get_flow_run_logs"
+    ) as mock_get_flow_run_logs, patch(
+        "ddpui.utils.webhook_helpers.email_orgusers"
+    ) as mock_email_orgusers:
+        email_flowrun_logs_to_orgusers(org, "flow-run-id")
+        mock_get_flow_run_logs.assert_not_called()
+        mock_email_orgusers.assert_not_called()
+
+
 def test_post_notification_unauthorized():
     """tests the api endpoint /notifications/"""
     request = Mock()
@@ -225,3 +239,49 @@ def test_post_notification():
             OrgUser.objects.create(org=org, user=user, role=OrgUserRole.ACCOUNT_MANAGER)
             response = post_notification(request)
             assert response["status"] == "ok"
+
+
+def test_post_notification_v1_failed_flow_run():
+    """the logs of a failed flow run are emailed to its org"""
+    request = Mock()
+    request.body = json.dumps(
+        {"body": "Flow run flow-run-name with id test-flow-run-id entered state Failed"}
+    )
+    request.headers = {
+        "X-Notification-Key": os.getenv("PREFECT_NOTIFICATIONS_WEBHOOK_KEY")
+    }
+    org = Org.objects.create(name="temp", slug="temp")
+    flow_run = {"parameters": {"config": {"org_slug": "temp"}}}
+    with patch(
+        "ddpui.ddpprefect.prefect_service.get_flow_run"
+    ) as mock_get_flow_run, patch(
+        "ddpui.api.webhook_api.email_flowrun_logs_to_orgusers"
+    ) as mock_email_flowrun_logs_to_orgusers:
+        mock_get_flow_run.return_value = flow_run
+        response = post_notification_v1(request)
+        assert response["status"] == "ok"
+        mock_get_flow_run.assert_called_once_with("test-flow-run-id")
+        mock_email_flowrun_logs_to_orgusers.assert_called_once_with(
+            org, "test-flow-run-id"
+        )
+
+
+def test_post_notification_v1_failed_flow_run_no_org():
+    """the logs of a failed flow run are not fetched when its org is not found"""
+    request = Mock()
+    request.body = json.dumps(
+        {"body": "Flow run flow-run-name with id test-flow-run-id entered state Failed"}
+    )
+    request.headers = {
+        "X-Notification-Key": os.getenv("PREFECT_NOTIFICATIONS_WEBHOOK_KEY")
+    }
+    flow_run = {"parameters": {"config": {"org_slug": "no-such-org"}}}
+    with patch(
+        "ddpui.ddpprefect.prefect_service.get_flow_run"
+    ) as mock_get_flow_run, patch(
+        "ddpui.ddpprefect.prefect_service.get_flow_run_logs"
+    ) as mock_get_flow_run_logs:
+        mock_get_flow_run.return_value = flow_run
+        response = post_notification_v1(request)
+        assert response["status"] == "ok"
+        mock_get_flow_run_logs.assert_not_called()
@@ -0,0 +1,65 @@
+import pytest
+from unittest.mock import patch
+from django.contrib.auth.models import User
+from ddpui.models.org import Org
+from ddpui.models.org_user import OrgUser
+from ddpui.models.tasks import Task, OrgTask, TaskLock, TaskLockStatus
+from ddpui.core.orgtaskfunctions import (
+    fetch_orgtask_lock,
+    fetch_orgtask_lock_flow_runs,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def org_tasks():
+    """two airbyte-sync org tasks"""
+    org = Org.objects.create(slug="test-org-slug")
+    task = Task.objects.create(
+        type="airbyte", slug="airbyte-sync", label="AIRBYTE sync"
+    )
+    return [
+        OrgTask.objects.create(org=org, task=task, connection_id=connection_id)
+        for connection_id in ["conn-1", "conn-2"]
+    ]
+
+
+@pytest.fixture
+def orguser(org_tasks):
+    """an org user for the test org"""
+    user = User.objects.create(email="tempuseremail", username="tempusername")
+    return OrgUser.objects.create(user=user, org=org_tasks[0].org)
+
+
+def test_fetch_orgtask_lock_none(org_tasks):
+    """no lock on the org task"""
+    assert fetch_orgtask_lock(org_tasks[0], {}) is None
+
+
+@patch("ddpui.ddpprefect.prefect_service.get_flow_runs_by_ids")
+@patch("ddpui.ddpprefect.prefect_service.get_flow_run")
+def test_fetch_orgtask_lock_with_flow_run_map(
+    mock_get_flow_run, mock_get_flow_runs_by_ids, org_tasks, orguser
+):
+    """lock statuses are read from the prefetched flow runs"""
+    TaskLock.objects.create(
+        orgtask=org_tasks[0], locked_by=orguser, flow_run_id="test-flow-run-id"
+    )
+    TaskLock.objects.create(orgtask=org_tasks[1], locked_by=orguser)
+    mock_get_flow_runs_by_ids.return_value = {
+        "test-flow-run-id": {"id": "test-flow-run-id", "state_type": "RUNNING"}
+    }
+
+    flow_run_map = fetch_orgtask_lock_flow_runs(org_tasks)
+    # the lock without a flow run is not looked up
+    mock_get_flow_runs_by_ids.assert_called_once_with(["test-flow-run-id"])
+
+    lock = fetch_orgtask_lock(org_tasks[0], flow_run_map)
+    assert lock["flowRunId"] == "test-flow-run-id"
+    assert lock["status"] == TaskLockStatus.RUNNING
+
+    lock = fetch_orgtask_lock(org_tasks[1], flow_run_map)
+    assert lock["flowRunId"] == ""
+    assert lock["status"] == TaskLockStatus.QUEUED
+    mock_get_flow_run.assert_not_called()
@@ -1,10 +1,44 @@
 import pytest
 from pathlib import Path
 import os, json
+import uuid
+from unittest.mock import patch
 from django.apps import apps
-from ddpui.models.org import Org, OrgPrefectBlockv1
-from ddpui.models.tasks import Task, OrgTask
-from ddpui.ddpprefect import AIRBYTESERVER
+from django.contrib.auth.models import User
+from ddpui.models.org import Org, OrgPrefectBlockv1, OrgDataFlowv1
+from ddpui.models.org_user import OrgUser
+from ddpui.models.tasks import (
+    Task,
+    OrgTask,
+    DataflowOrgTask,
+    TaskLock,
+    TaskLockStatus,
+)
+from ddpui.ddpprefect import (
+    AIRBYTESERVER,
+    AIRBYTECONNECTION,
+    DBTCLIPROFILE,
+    DBTCORE,
+    SECRET,
+    SHELLOPERATION,
+)
+from ddpui.ddpdbt.schema import DbtProjectParams
+from ddpui.core.pipelinefunctions import (
+    pipeline_with_orgtasks,
+    fetch_pipeline_lock,
+    fetch_pipeline_lock_flow_runs,
+    fetch_orgtasks_by_connection_ids,
+    fetch_orgtasks_by_uuids,
+    setup_airbyte_sync_task_config,
+    setup_dbt_core_task_config,
+    setup_git_pull_shell_task_config,
+)
+from ddpui.utils.constants import (
+    TASK_GITPULL,
+    TASK_DBTCLEAN,
+    TASK_DBTDEPS,
+    TASK_DBTRUN,
+)
 
 pytestmark = pytest.mark.django_db
 
@@ -58,3 +92,313 @@ def generate_transform_org_tasks(seed_master_tasks, org_with_server_block):
 
 
 # ================================================================================
+
+
+@pytest.fixture
+def dbt_project_params():
+    """dbt project params for the test org"""
+    return DbtProjectParams(
+        dbt_env_dir="/path/to/venv",
+        dbt_binary="/path/to/venv/bin/dbt",
+        project_dir="/path/to/project",
+        target="dev",
+        dbt_repo_dir="/path/to/project/dbtrepo",
+    )
+
+
+@pytest.fixture
+def cli_profile_block(org_with_server_block):
+    """dbt cli profile block for the test org"""
+    return OrgPrefectBlockv1.objects.create(
+        block_type=DBTCLIPROFILE,
+        block_id="test-cli-blk-id",
+        block_name="test-cli-blk",
+        org=org_with_server_block,
+    )
+
+
+@pytest.fixture
+def gitpull_secret_block(org_with_server_block):
+    """git-pull secret block for the test org"""
+    block = OrgPrefectBlockv1.objects.create(
+        block_type=SECRET,
+        block_id="test-secret-blk-id",
+        block_name="test-org-slug-git-pull-url",
+        org=org_with_server_block,
+    )
+    yield block
+
+
+# ================================================================================
+def test_pipeline_with_orgtasks_transform(
+    generate_transform_org_tasks,
+    org_with_server_block,
+    cli_profile_block,
+    gitpull_secret_block,
+    dbt_project_params,
+    django_assert_num_queries,
+):
+    """builds task configs for the system transform tasks in order"""
+    org_tasks = [
+        OrgTask.objects.filter(org=org_with_server_block, task__slug=slug).first()
+        for slug in [TASK_GITPULL, TASK_DBTCLEAN, TASK_DBTDEPS, TASK_DBTRUN]
+    ]
+
+    # one query to fetch the master tasks, one for the git-pull secret block
+    with django_assert_num_queries(2):
+        task_configs, error = pipeline_with_orgtasks(
+            org_with_server_block,
+            org_tasks,
+            cli_block=cli_profile_block,
+            dbt_project_params=dbt_project_params,
+            start_seq=2,
+        )
+
+    assert error is None
+    assert [task_config["slug"] for task_config in task_configs] == [
+        TASK_GITPULL,
+        TASK_DBTCLEAN,
+        TASK_DBTDEPS,
+        TASK_DBTRUN,
+    ]
+    assert [task_config["seq"] for task_config in task_configs] == [2, 3, 4, 5]
+    assert task_configs[0]["type"] == SHELLOPERATION
+    assert task_configs[0]["env"] == {
+        "secret-git-pull-url-block": gitpull_secret_block.block_name
+    }
+    assert task_configs[1]["type"] == DBTCORE
+    assert task_configs[1]["cli_profile_block"] == cli_profile_block.block_name
+
+
+def test_pipeline_with_orgtasks_sync(generate_sync_org_tasks, org_with_server_block):
+    """builds airbyte sync task configs without looking up the git-pull secret block"""
+    server_block = OrgPrefectBlockv1.objects.filter(
+        org=org_with_server_block, block_type=AIRBYTESERVER
+    ).first()
+    org_tasks = list(OrgTask.objects.filter(org=org_with_server_block))
+
+    task_configs, error = pipeline_with_orgtasks(
+        org_with_server_block, org_tasks, server_block=server_block
+    )
+
+    assert error is None
+    assert len(task_configs) == len(CONNECTION_IDS)
+    for seq, task_config in enumerate(task_configs):
+        assert task_config["seq"] == seq
+        assert task_config["type"] == AIRBYTECONNECTION
+        assert task_config["airbyte_server_block"] == server_block.block_name
+
+
+def test_pipeline_with_orgtasks_matches_task_setup_schemas(
+    generate_transform_org_tasks,
+    generate_sync_org_tasks,
+    org_with_server_block,
+    cli_profile_block,
+    gitpull_secret_block,
+    dbt_project_params,
+):
+    """the task configs in a pipeline are the same payloads the setup_* schemas produce"""
+    server_block = OrgPrefectBlockv1.objects.filter(
+        org=org_with_server_block, block_type=AIRBYTESERVER
+    ).first()
+    sync_task = OrgTask.objects.filter(
+        org=org_with_server_block, task__slug="airbyte-sync"
+    ).first()
+    gitpull_task = OrgTask.objects.filter(
+        org=org_with_server_block, task__slug=TASK_GITPULL
+    ).first()
+    dbtrun_task = OrgTask.objects.filter(
+        org=org_with_server_block, task__slug=TASK_DBTRUN
+    ).first()
+
+    task_configs, error = pipeline_with_orgtasks(
+        org_with_server_block,
+        [sync_task, gitpull_task, dbtrun_task],
+        server_block=server_block,
+        cli_block=cli_profile_block,
+        dbt_project_params=dbt_project_params,
+    )
+
+    assert error is None
+    assert task_configs == [
+        setup_airbyte_sync_task_config(sync_task, server_block, 0).to_json(),
+        setup_git_pull_shell_task_config(
+            gitpull_task, dbt_project_params.project_dir, gitpull_secret_block, 1
+        ).to_json(),
+        setup_dbt_core_task_config(
+            dbtrun_task, cli_profile_block, dbt_project_params, 2
+        ).to_json(),
+    ]
+
+
+def test_setup_dbt_core_task_config_payload(
+    generate_transform_org_tasks,
+    org_with_server_block,
+    cli_profile_block,
+    dbt_project_params,
+):
+    """the payload prefect receives for a dbt job"""
+    org_task = OrgTask.objects.filter(
+        org=org_with_server_block, task__slug=TASK_DBTRUN
+    ).first()
+
+    assert setup_dbt_core_task_config(
+        org_task, cli_profile_block, dbt_project_params, 3
+    ).to_json() == {
+        "seq": 3,
+        "slug": TASK_DBTRUN,
+        "commands": [f"/path/to/venv/bin/dbt {org_task.task.command} --target dev"],
+        "type": DBTCORE,
+        "env": {},
+        "working_dir": "/path/to/project",
+        "profiles_dir": "/path/to/project/profiles/",
+        "project_dir": "/path/to/project",
+        "cli_profile_block": "test-cli-blk",
+        "cli_args": [],
+        "orgtask_uuid": str(org_task.uuid),
+        "flow_name": None,
+        "flow_run_name": None,
+    }
+
+
+def test_pipeline_with_orgtasks_task_parameters(
+    generate_transform_org_tasks,
+    org_with_server_block,
+    cli_profile_block,
+    dbt_project_params,
+):
+    """the flags and options of an org task are appended to its dbt command"""
+    org_task = OrgTask.objects.filter(
+        org=org_with_server_block, task__slug=TASK_DBTRUN
+    ).first()
+    org_task.parameters = {
+        "flags": ["full-refresh"],
+        "options": {"select": "model1", "threads": 4},
+    }
+
+    task_configs, error = pipeline_with_orgtasks(
+        org_with_server_block,
+        [org_task],
+        cli_block=cli_profile_block,
+        dbt_project_params=dbt_project_params,
+    )
+
+    assert error is None
+    assert task_configs[0]["commands"] == [
+        f"{dbt_project_params.dbt_binary} {org_task.task.command} --full-refresh"
+        f" --select model1 --threads 4 --target {dbt_project_params.target}"
+    ]
+
+
+@pytest.fixture
+def dataflow_with_transform_tasks(generate_transform_org_tasks, org_with_server_block):
+    """a dataflow mapped to the system transform org tasks"""
+    dataflow = OrgDataFlowv1.objects.create(
+        org=org_with_server_block,
+        name="test-dataflow",
+        deployment_name="test-deployment",
+        deployment_id="test-deployment-id",
+        dataflow_type="orchestrate",
+    )
+    for seq, org_task in enumerate(OrgTask.objects.filter(org=org_with_server_block)):
+        DataflowOrgTask.objects.create(dataflow=dataflow, orgtask=org_task, seq=seq)
+    return dataflow
+
+
+@pytest.fixture
+def orguser(org_with_server_block):
+    """an org user for the test org"""
+    user = User.objects.create(email="tempuseremail", username="tempusername")
+    return OrgUser.objects.create(user=user, org=org_with_server_block)
+
+
+def test_fetch_pipeline_lock_none(dataflow_with_transform_tasks):
+    """no lock on any of the dataflow's org tasks"""
+    assert fetch_pipeline_lock(dataflow_with_transform_tasks) is None
+
+
+def test_fetch_pipeline_lock_queued(
+    dataflow_with_transform_tasks, orguser, django_assert_num_queries
+):
+    """a lock without a flow run is queued, and is read in a single query"""
+    dataflow_orgtask = DataflowOrgTask.objects.filter(
+        dataflow=dataflow_with_transform_tasks
+    ).first()
+    TaskLock.objects.create(
+        orgtask=dataflow_orgtask.orgtask,
+        locked_by=orguser,
+        locking_dataflow=dataflow_with_transform_tasks,
+    )
+
+    with django_assert_num_queries(1) as captured:
+        lock = fetch_pipeline_lock(dataflow_with_transform_tasks)
+
+    # only the columns that are used are read
+    select_list = captured.captured_queries[0]["sql"].split(" FROM ")[0]
+    assert "celery_task_id" not in select_list
+    assert '"auth_user"."password"' not in select_list
+
+    assert lock["lockedBy"] == orguser.user.email
+    assert lock["flowRunId"] == ""
+    assert lock["status"] == TaskLockStatus.QUEUED
+
+
+@patch("ddpui.ddpprefect.prefect_service.get_flow_runs_by_ids")
+@patch("ddpui.ddpprefect.prefect_service.get_flow_run")
+def test_fetch_pipeline_lock_with_flow_run_map(
+    mock_get_flow_run, mock_get_flow_runs_by_ids, dataflow_with_transform_tasks, orguser
+):
+    """lock statuses are read from the prefetched flow runs"""
+    for dataflow_orgtask in DataflowOrgTask.objects.filter(
+        dataflow=dataflow_with_transform_tasks
+    ):
+        TaskLock.objects.create(
+            orgtask=dataflow_orgtask.orgtask,
+            locked_by=orguser,
+            locking_dataflow=dataflow_with_transform_tasks,
+            flow_run_id="test-flow-run-id",
+        )
+    mock_get_flow_runs_by_ids.return_value = {
+        "test-flow-run-id": {"id": "test-flow-run-id", "state_type": "RUNNING"}
+    }
+
+    flow_run_map = fetch_pipeline_lock_flow_runs([dataflow_with_transform_tasks])
+    flow_run_ids = mock_get_flow_runs_by_ids.call_args.args[0]
+    assert set(flow_run_ids) == {"test-flow-run-id"}
+
+    lock = fetch_pipeline_lock(dataflow_with_transform_tasks, flow_run_map)
+    assert lock["flowRunId"] == "test-flow-run-id"
+    assert lock["status"] == TaskLockStatus.RUNNING
+    mock_get_flow_run.assert_not_called()
+
+
+def test_fetch_orgtasks_by_connection_ids(
+    generate_sync_org_tasks, org_with_server_block, django_assert_num_queries
+):
+    """the org tasks of all the connections are read in one query"""
+    with django_assert_num_queries(1):
+        connection_orgtasks = fetch_orgtasks_by_connection_ids(
+            org_with_server_block, CONNECTION_IDS + ["unknown-conn-id"]
+        )
+        assert sorted(connection_orgtasks.keys()) == sorted(CONNECTION_IDS)
+        for connection_id, org_task in connection_orgtasks.items():
+            assert org_task.connection_id == connection_id
+            assert org_task.task.slug == "airbyte-sync"
+
+
+def test_fetch_orgtasks_by_uuids(
+    generate_transform_org_tasks, org_with_server_block, django_assert_num_queries
+):
+    """org tasks are read in one query and keyed by their uuid as a string"""
+    org_tasks = list(
+        OrgTask.objects.filter(org=org_with_server_block).select_related("task")[:2]
+    )
+    for org_task in org_tasks:
+        org_task.uuid = uuid.uuid4()
+        org_task.save()
+    uuids = [str(org_task.uuid) for org_task in org_tasks]
+
+    with django_assert_num_queries(1):
+        orgtasks_by_uuid = fetch_orgtasks_by_uuids(uuids + [str(uuid.uuid4())])
+        assert sorted(orgtasks_by_uuid.keys()) == sorted(uuids)
+        assert orgtasks_by_uuid[uuids[0]].task.slug == org_tasks[0].task.slug
@@ -8,6 +8,7 @@ from ddpui.ddpairbyte.airbytehelpers import (
     get_job_info_for_connection,
     update_destination,
     delete_source,
+    get_connections,
 )
 from ddpui.ddpairbyte.schema import AirbyteDestinationUpdate
 from ddpui.models.org import Org, OrgPrefectBlockv1, OrgWarehouse
@@ -573,6 +574,61 @@ def test_update_destination_cliprofile(
     )
 
 
+@patch(
+    "ddpui.ddpairbyte.airbyte_service.update_destination",
+    mock_update_destination=Mock(),
+)
+@patch(
+    "ddpui.utils.secretsmanager.retrieve_warehouse_credentials",
+    mock_retrieve_warehouse_credentials=Mock(),
+)
+@patch(
+    "ddpui.utils.secretsmanager.update_warehouse_credentials",
+    mock_update_warehouse_credentials=Mock(),
+)
+@patch(
+    "ddpui.ddpprefect.prefect_service.update_dbt_cli_profile_block",
+    mock_update_dbt_cli_profile_block=Mock(),
+)
+def test_update_destination_credentials_unchanged(
+    mock_update_dbt_cli_profile_block: Mock,
+    mock_update_warehouse_credentials: Mock,
+    mock_retrieve_warehouse_credentials: Mock,
+    mock_update_destination: Mock,
+):
+    """the secret is left alone if the credentials are unchanged, the cli profile is not"""
+    org = Org.objects.create(name="org", slug="org")
+    OrgWarehouse.objects.create(org=org, wtype="postgres", name="name")
+    OrgPrefectBlockv1.objects.create(
+        org=org, block_type=DBTCLIPROFILE, block_name="cliblockname"
+    )
+
+    mock_update_destination.return_value = {
+        "destinationId": "DESTINATION_ID",
+    }
+    mock_retrieve_warehouse_credentials.return_value = {
+        "host": "host",
+        "port": "123",
+    }
+
+    payload = AirbyteDestinationUpdate(
+        name="name",
+        destinationDefId="destinationDefId",
+        config={"host": "host", "port": "123", "password": "*****"},
+    )
+    response, error = update_destination(org, "destination_id", payload)
+    assert error is None
+    assert response == {"destinationId": "DESTINATION_ID"}
+
+    mock_update_warehouse_credentials.assert_not_called()
+    mock_update_dbt_cli_profile_block.assert_called_once_with(
+        block_name="cliblockname",
+        wtype="postgres",
+        credentials={"host": "host", "port": "123"},
+        bqlocation=None,
+    )
+
+
 @patch("ddpui.ddpairbyte.airbyte_service.get_connections", mock_get_connections=Mock())
 @patch(
     "ddpui.ddpprefect.prefect_service.delete_deployment_by_id",
@@ -623,3 +679,51 @@ def test_delete_source(
     ).exists()
 
     mock_delete_source.assert_called_once()
+
+
+@patch("ddpui.ddpairbyte.airbytehelpers.fetch_orgtask_lock", Mock(return_value=None))
+@patch(
+    "ddpui.ddpairbyte.airbytehelpers.prefect_service.get_last_flow_runs_by_deployment_ids"
+)
+@patch("ddpui.ddpairbyte.airbytehelpers.airbyte_service.get_connection")
+def test_get_connections_fetches_each_last_run_once(
+    mock_get_connection: Mock, mock_get_last_flow_run: Mock
+):
+    """a pipeline syncing several connections has its last run fetched only once"""
+    org = Org.objects.create(name="org", slug="org", airbyte_workspace_id="wsid")
+    OrgWarehouse.objects.create(org=org, wtype="postgres", name="warehouse")
+    task = Task.objects.create(
+        type="airbyte", slug="airbyte-sync", label="AIRBYTE sync"
+    )
+    pipeline = OrgDataFlowv1.objects.create(
+        org=org, dataflow_type="orchestrate", deployment_id="pipeline-dep"
+    )
+    for connection_id in ["conn-1", "conn-2"]:
+        orgtask = OrgTask.objects.create(
+            org=org, task=task, connection_id=connection_id
+        )
+        manual = OrgDataFlowv1.objects.create(
+            org=org, dataflow_type="manual", deployment_id=f"{connection_id}-dep"
+        )
+        DataflowOrgTask.objects.create(dataflow=manual, orgtask=orgtask)
+        DataflowOrgTask.objects.create(dataflow=pipeline, orgtask=orgtask)
+
+    mock_get_connection.side_effect = lambda workspace_id, connection_id: {
+        "name": connection_id,
+        "connectionId": connection_id,
+        "source": {},
+        "destination": {},
+        "catalogId": "catalog-id",
+        "syncCatalog": {},
+        "status": "active",
+    }
+    mock_get_last_flow_run.side_effect = lambda deployment_ids: {
+        deployment_id: None for deployment_id in deployment_ids
+    }
+
+    res, error = get_connections(org)
+
+    assert error is None
+    mock_get_last_flow_run.assert_called_once()
+    assert [conn["deploymentId"] for conn in res] == ["conn-1-dep", "conn-2-dep"]
+    assert res[0]["destination"]["name"] == "warehouse"
@@ -1,5 +1,6 @@
-from unittest.mock import patch
+from unittest.mock import patch, MagicMock
 from ddpui.utils.prefectlogs import (
+    fetch_logs_from_db,
     remove_timestamps,
     skip_line,
     parse_airbyte_wait_for_completion_log,
@@ -292,3 +293,57 @@ def test_parse_prefect_logs_3():
                 "task_name": "airbyte sync",
             }
         ]
+
+
+def test_fetch_logs_from_db_streams_subflow_logs():
+    """no logs on the parent flow run, so the subflow's logs are streamed"""
+    parent_logs = MagicMock()
+    parent_logs.__iter__.return_value = iter([])
+    subflow_cursor = MagicMock()
+    subflow_cursor.fetchall.return_value = [("subflow-id",)]
+    subflow_logs = MagicMock()
+    subflow_logs.__iter__.return_value = iter(
+        [("ts", "task", "Completed", "COMPLETED", "message")]
+    )
+    connection = MagicMock()
+    connection.cursor.return_value.__enter__.side_effect = [
+        parent_logs,
+        subflow_cursor,
+        subflow_logs,
+    ]
+
+    with patch(
+        "ddpui.utils.prefectlogs.psycopg2.connect", return_value=connection
+    ) as mock_connect:
+        messages = fetch_logs_from_db({}, "flow-run-id")
+        mock_connect.assert_not_called()
+        assert list(messages) == [
+            {
+                "timestamp": "ts",
+                "task_name": "task",
+                "state_name": "Completed",
+                "state_type": "COMPLETED",
+                "message": "message",
+            }
+        ]
+
+    # the flow run id is passed as a query parameter
+    assert parent_logs.execute.call_args[0][1] == ("flow-run-id",)
+    assert subflow_logs.execute.call_args[0][1] == ("subflow-id",)
+    # the subflow is read over the same connection
+    mock_connect.assert_called_once()
+    connection.close.assert_called_once()
+
+
+def test_fetch_logs_from_db_no_logs():
+    """no logs and no subflow"""
+    no_logs = MagicMock()
+    no_logs.__iter__.return_value = iter([])
+    no_subflow = MagicMock()
+    no_subflow.fetchall.return_value = []
+    connection = MagicMock()
+    connection.cursor.return_value.__enter__.side_effect = [no_logs, no_subflow]
+
+    with patch("ddpui.utils.prefectlogs.psycopg2.connect", return_value=connection):
+        assert list(fetch_logs_from_db({}, "flow-run-id")) == []
+    connection.close.assert_called_once()
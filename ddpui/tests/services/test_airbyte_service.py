@@ -103,7 +103,7 @@ def test_abreq_success():
         "workspaces": [{"workspaceId": "1", "name": "Example Workspace"}]
     }
 
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_post.return_value.status_code = 200
         mock_post.return_value.headers = {"Content-Type": "application/json"}
         mock_post.return_value.json.return_value = expected_response
@@ -116,10 +116,27 @@ def test_abreq_success():
     assert isinstance(result["workspaces"], list)
 
 
+def test_abreq_url_and_headers():
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
+        mock_post.return_value.status_code = 200
+        mock_post.return_value.headers = {"Content-Type": "application/json"}
+        mock_post.return_value.json.return_value = {}
+
+        abreq("workspaces/list", {"k": "v"})
+
+    mock_post.assert_called_once_with(
+        f"http://{os.getenv('AIRBYTE_SERVER_HOST')}:{os.getenv('AIRBYTE_SERVER_PORT')}"
+        f"/api/{os.getenv('AIRBYTE_SERVER_APIVER')}/workspaces/list",
+        headers={"Authorization": f"Basic {os.getenv('AIRBYTE_API_TOKEN')}"},
+        json={"k": "v"},
+        timeout=30,
+    )
+
+
 def test_abreq_connection_error():
     endpoint = "my_endpoint"
 
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_post.side_effect = requests.exceptions.ConnectionError(
             "Error connecting to Airbyte server"
         )
@@ -136,7 +153,7 @@ def test_abreq_connection_error():
 #     endpoint = "workspaces/create"
 #     req = {"invalid_key": "invalid_value"}
 
-#     with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+#     with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
 #         mock_post.return_value.status_code = 400
 #         mock_post.return_value.headers = {"Content-Type": "application/json"}
 #         mock_post.return_value.json.return_value = {"error": "Invalid request data"}
@@ -147,7 +164,7 @@ def test_abreq_connection_error():
 
 
 def test_get_workspaces_success():
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_post.return_value.status_code = 200
         mock_post.return_value.headers = {"Content-Type": "application/json"}
         mock_post.return_value.json.return_value = {
@@ -160,7 +177,7 @@ def test_get_workspaces_success():
 
 
 def test_get_workspaces_failure():
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_post.return_value.status_code = 404
         mock_post.return_value.headers = {"Content-Type": "application/json"}
         mock_post.return_value.json.return_value = {"error": "Invalid request data"}
@@ -172,7 +189,7 @@ def test_get_workspaces_failure():
 
 def test_create_workspace_with_valid_name(valid_name):
     # check if workspace is created successfully using mock_abreq
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_post.return_value.status_code = 200
         mock_post.return_value.headers = {"Content-Type": "application/json"}
         mock_post.return_value.json.return_value = {
@@ -192,7 +209,7 @@ def test_create_workspace_invalid_name():
 
 
 def test_create_workspace_failure():
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_post.return_value.status_code = 400
         mock_post.return_value.headers = {"Content-Type": "application/json"}
         mock_post.return_value.json.return_value = {"error": "Invalid request data"}
@@ -203,7 +220,7 @@ def test_create_workspace_failure():
 
 
 def test_get_workspace_success():
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_post.return_value.status_code = 200
         mock_post.return_value.headers = {"Content-Type": "application/json"}
         mock_post.return_value.json.return_value = {
@@ -222,7 +239,7 @@ def test_get_workspace_success_with_invalid_workspace_id():
 
 
 def test_get_workspace_failure():
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_post.return_value.status_code = 404
         mock_post.return_value.headers = {"Content-Type": "application/json"}
         mock_post.return_value.json.return_value = {"error": "Invalid request data"}
@@ -233,7 +250,7 @@ def test_get_workspace_failure():
 
 
 def test_set_workspace_name_success():
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_post.return_value.status_code = 200
         mock_post.return_value.headers = {"Content-Type": "application/json"}
         mock_post.return_value.json.return_value = {
@@ -258,7 +275,7 @@ def test_set_workspace_name_with_invalid_name():
 
 
 def test_set_workspace_name_failure():
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_post.return_value.status_code = 404
         mock_post.return_value.headers = {"Content-Type": "application/json"}
         mock_post.return_value.json.return_value = {"error": "Invalid request data"}
@@ -269,7 +286,7 @@ def test_set_workspace_name_failure():
 
 
 def test_get_source_definitions_success():
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_post.return_value.status_code = 200
         mock_post.return_value.headers = {"Content-Type": "application/json"}
         mock_post.return_value.json.return_value = {
@@ -283,7 +300,7 @@ def test_get_source_definitions_success():
 
 
 def test_get_source_definitions_failure():
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_post.return_value.status_code = 404
         mock_post.return_value.headers = {"Content-Type": "application/json"}
         mock_post.return_value.json.return_value = {"error": "Invalid request data"}
@@ -315,7 +332,7 @@ def test_get_source_definition_specification_success():
 
 
 def test_get_source_definition_specification_failure():
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_post.return_value.status_code = 404
         mock_post.return_value.headers = {"Content-Type": "application/json"}
         mock_post.return_value.json.return_value = {"error": "Invalid request data"}
@@ -378,7 +395,7 @@ def test_create_custom_source_definition_success():
     documentation_url = "test"
     expected_response = {"sourceDefinitionId": "1", "name": "test"}
 
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_post.return_value.status_code = 200
         mock_post.return_value.headers = {"Content-Type": "application/json"}
         mock_post.return_value.json.return_value = expected_response
@@ -395,7 +412,7 @@ def test_create_custom_source_definition_failure():
     docker_repository = "test"
     docker_image_tag = "test"
     documentation_url = "test"
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_post.return_value.status_code = 404
         mock_post.return_value.headers = {"Content-Type": "application/json"}
         mock_post.return_value.json.return_value = {"error": "Invalid request data"}
@@ -415,7 +432,7 @@ def test_get_sources_success():
     workspace_id = "my_workspace_id"
     expected_response = {"sources": [{"sourceId": "1", "name": "Example Source 1"}]}
 
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_post.return_value.status_code = 200
         mock_post.return_value.headers = {"Content-Type": "application/json"}
         mock_post.return_value.json.return_value = expected_response
@@ -425,7 +442,7 @@ def test_get_sources_success():
 
 def test_get_sources_failure():
     workspace_id = "my_workspace_id"
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_post.return_value.status_code = 404
         mock_post.return_value.headers = {"Content-Type": "application/json"}
         mock_post.return_value.json.return_value = {"error": "Invalid request data"}
@@ -446,7 +463,7 @@ def test_get_source_success():
     source_id = "1"
     expected_response = {"sourceId": "1", "name": "Example Source 1"}
 
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_post.return_value.status_code = 200
         mock_post.return_value.headers = {"Content-Type": "application/json"}
         mock_post.return_value.json.return_value = expected_response
@@ -459,7 +476,7 @@ def test_get_source_success():
 def test_get_source_failure():
     workspace_id = "my_workspace_id"
     source_id = "1"
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_post.return_value.status_code = 404
         mock_post.return_value.headers = {"Content-Type": "application/json"}
         mock_post.return_value.json.return_value = {"error": "Invalid request data"}
@@ -486,7 +503,7 @@ def test_delete_source_success():
     source_id = "1"
     expected_response = {"sourceId": "1", "name": "Example Source 1"}
 
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_post.return_value.status_code = 200
         mock_post.return_value.headers = {"Content-Type": "application/json"}
         mock_post.return_value.json.return_value = expected_response
@@ -583,7 +600,7 @@ def test_update_source_success():
         "config": {"test": "test"},
         "sourcedef_id": "1",
     }
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_post.return_value.status_code = 200
         mock_post.return_value.json.return_value = expected_response
         mock_post.return_value.headers = {"Content-Type": "application/json"}
@@ -597,7 +614,7 @@ def test_update_source_failure():
     name = "source"
     source_id = "1"
     sourcedef_id = "1"
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_post.return_value.status_code = 500
         mock_post.return_value.headers = {"Content-Type": "application/json"}
         mock_post.return_value.json.return_value = {"error": "Invalid request data"}
@@ -674,7 +691,7 @@ def test_check_source_connection_with_invalid_workspace_id():
         sourceDefId="my_sourcedef_id",
         config={"key": "value"},
     )
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_post.return_value.status_code = 500
         mock_post.return_value.json.return_value = {"error": "Invalid request data"}
         with pytest.raises(HttpError) as excinfo:
@@ -688,7 +705,7 @@ def test_check_source_connection_for_update_success():
         name="my_source_name",
         config={"key": "value"},
     )
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_response = Mock(spec=requests.Response)
         mock_response.headers = {"Content-Type": "application/json"}
         mock_response.status_code = 200
@@ -704,7 +721,7 @@ def test_check_source_connection_for_update_failure():
         name="my_source_name",
         config={"key": "value"},
     )
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_response = Mock(spec=requests.Response)
         mock_response.headers = {"Content-Type": "application/json"}
         mock_response.status_code = 500
@@ -725,7 +742,7 @@ def test_get_source_schema_catalog_success():
     source_id = "my_source_id"
     expected_response = {"catalog": "catalog"}
 
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_post.return_value.status_code = 200
         mock_post.return_value.json.return_value = expected_response
         mock_post.return_value.headers = {"Content-Type": "application/json"}
@@ -738,7 +755,7 @@ def test_get_source_schema_catalog_success():
 def test_get_source_schema_catalog_failure_1():
     workspace_id = "my_workspace_id"
     source_id = "my_source_id"
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_response = Mock(spec=requests.Response)
         mock_response.status_code = 500
         mock_response.headers = {"Content-Type": "application/json"}
@@ -756,7 +773,7 @@ def test_get_source_schema_catalog_failure_1():
 def test_get_source_schema_catalog_failure_2():
     workspace_id = "my_workspace_id"
     source_id = "my_source_id"
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_response = Mock(spec=requests.Response)
         mock_response.status_code = 500
         mock_response.headers = {"Content-Type": "application/json"}
@@ -775,7 +792,7 @@ def test_get_source_schema_catalog_failure_2():
 def test_get_source_schema_catalog_with_invalid_workspace_id():
     workspace_id = 123
     source_id = "my_source_id"
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_post.return_value.status_code = 500
         mock_post.return_value.json.return_value = {"error": "Invalid request data"}
         with pytest.raises(HttpError) as excinfo:
@@ -786,7 +803,7 @@ def test_get_source_schema_catalog_with_invalid_workspace_id():
 def test_get_source_schema_catalog_with_invalid_source_id():
     workspace_id = "my_workspace_id"
     source_id = 123
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_post.return_value.status_code = 500
         mock_post.return_value.json.return_value = {"error": "Invalid request data"}
         with pytest.raises(HttpError) as excinfo:
@@ -795,7 +812,7 @@ def test_get_source_schema_catalog_with_invalid_source_id():
 
 
 def test_get_destination_definitions_success():
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_response = Mock(spec=requests.Response)
         mock_response.status_code = 200
         mock_response.headers = {"Content-Type": "application/json"}
@@ -816,7 +833,7 @@ def test_get_destination_definitions_failure_with_invalid_workspace_id():
 
 
 def test_get_destination_definitions_failure():
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_response = Mock(spec=requests.Response)
         mock_response.status_code = 200
         mock_response.headers = {"Content-Type": "application/json"}
@@ -830,7 +847,7 @@ def test_get_destination_definitions_failure():
 
 
 def test_get_destination_definition():
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_response = Mock(spec=requests.Response)
         mock_response.status_code = 200
         mock_response.headers = {"Content-Type": "application/json"}
@@ -845,7 +862,7 @@ def test_get_destination_definition():
 
 
 def test_get_destination_definition_specification_success():
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_response = Mock(spec=requests.Response)
         mock_response.status_code = 200
         mock_response.headers = {"Content-Type": "application/json"}
@@ -866,7 +883,7 @@ def test_get_destination_definition_specification_success():
 
 
 def test_get_destination_definition_specification_success_postgres():
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_response = Mock(spec=requests.Response)
         mock_response.status_code = 200
         mock_response.headers = {"Content-Type": "application/json"}
@@ -911,7 +928,7 @@ def test_get_destination_definition_specification_with_invalid_destinationdef():
 
 
 def test_get_destination_definition_specification_failure():
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_response = Mock(spec=requests.Response)
         mock_response.status_code = 200
         mock_response.headers = {"Content-Type": "application/json"}
@@ -928,7 +945,7 @@ def test_get_destination_definition_specification_failure():
 
 
 def test_get_destinations_success():
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_response = Mock(spec=requests.Response)
         mock_response.status_code = 200
         mock_response.headers = {"Content-Type": "application/json"}
@@ -947,7 +964,7 @@ def test_get_destinations_with_invalid_workspace_id():
 
 
 def test_get_destinations_failure():
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_response = Mock(spec=requests.Response)
         mock_response.status_code = 200
         mock_response.headers = {"Content-Type": "application/json"}
@@ -960,7 +977,7 @@ def test_get_destinations_failure():
 
 
 def test_get_destination_success():
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_response = Mock(spec=requests.Response)
         mock_response.status_code = 200
         mock_response.headers = {"Content-Type": "application/json"}
@@ -985,7 +1002,7 @@ def test_get_destination_failure_with_invalid_destination_id():
 
 
 def test_get_destination_failure():
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_response = Mock(spec=requests.Response)
         mock_response.status_code = 200
         mock_response.headers = {"Content-Type": "application/json"}
@@ -998,7 +1015,7 @@ def test_get_destination_failure():
 
 
 def test_create_destination_success():
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_response = Mock(spec=requests.Response)
         mock_response.status_code = 200
         mock_response.headers = {"Content-Type": "application/json"}
@@ -1035,7 +1052,7 @@ def test_create_destination_failure_with_invalid_config():
 
 
 def test_create_destination_failure():
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_response = Mock(spec=requests.Response)
         mock_response.status_code = 200
         mock_response.headers = {"Content-Type": "application/json"}
@@ -1048,7 +1065,7 @@ def test_create_destination_failure():
 
 
 def test_update_destination_success():
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_response = Mock(spec=requests.Response)
         mock_response.status_code = 200
         mock_response.headers = {"Content-Type": "application/json"}
@@ -1085,7 +1102,7 @@ def test_update_destination_failure_with_invalid_destinationdef_id():
 
 
 def test_update_destination_failure():
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_response = Mock(spec=requests.Response)
         mock_response.status_code = 200
         mock_response.headers = {"Content-Type": "application/json"}
@@ -1101,7 +1118,7 @@ def test_check_destination_connection_success():
     payload = AirbyteDestinationCreate(
         name="destinationname", destinationDefId="destinationdef-id", config={}
     )
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_response = Mock(spec=requests.Response)
         mock_response.status_code = 200
         mock_response.headers = {"Content-Type": "application/json"}
@@ -1125,7 +1142,7 @@ def test_check_destination_connection_failure_1():
     payload = AirbyteDestinationCreate(
         name="destinationname", destinationDefId="destinationdef-id", config={}
     )
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_response = Mock(spec=requests.Response)
         mock_response.status_code = 200
         mock_response.headers = {"Content-Type": "application/json"}
@@ -1143,7 +1160,7 @@ def test_check_destination_connection_failure_2():
     payload = AirbyteDestinationCreate(
         name="destinationname", destinationDefId="destinationdef-id", config={}
     )
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_response = Mock(spec=requests.Response)
         mock_response.status_code = 200
         mock_response.headers = {"Content-Type": "application/json"}
@@ -1159,7 +1176,7 @@ def test_check_destination_connection_failure_2():
 
 def test_check_destination_connection_for_update_success():
     payload = AirbyteDestinationUpdateCheckConnection(name="destinationname", config={})
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_response = Mock(spec=requests.Response)
         mock_response.status_code = 200
         mock_response.headers = {"Content-Type": "application/json"}
@@ -1179,7 +1196,7 @@ def test_check_destination_connection_for_update_with_invalid_destination_id():
 
 def test_check_destination_connection_for_update_failure_1():
     payload = AirbyteDestinationUpdateCheckConnection(name="destinationname", config={})
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_response = Mock(spec=requests.Response)
         mock_response.status_code = 200
         mock_response.headers = {"Content-Type": "application/json"}
@@ -1195,7 +1212,7 @@ def test_check_destination_connection_for_update_failure_1():
 
 def test_check_destination_connection_for_update_failure_2():
     payload = AirbyteDestinationUpdateCheckConnection(name="destinationname", config={})
-    with patch("ddpui.ddpairbyte.airbyte_service.requests.post") as mock_post:
+    with patch("ddpui.ddpairbyte.airbyte_service.http_session.post") as mock_post:
         mock_response = Mock(spec=requests.Response)
         mock_response.status_code = 200
         mock_response.headers = {"Content-Type": "application/json"}
@@ -1,7 +1,13 @@
 import os
+import asyncio
+import json
+from collections import deque
+from datetime import timedelta
+import orjson
 import django
-from unittest.mock import patch, Mock
+from unittest.mock import patch, Mock, AsyncMock
 import pytest
+from django.utils import timezone
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ddpui.settings")
 os.environ["DJANGO_ALLOW_ASYNC_UNSAFE"] = "true"
@@ -9,12 +15,24 @@ django.setup()
 
 pytestmark = pytest.mark.django_db
 
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from ddpui.models.flow_runs import PrefectFlowRun
+from ddpui.models.org import Org, OrgDataFlowv1
+from ddpui.models.org_user import OrgUser
+from ddpui.models.tasks import Task, OrgTask, DataflowOrgTask, TaskLock
 
+
+from urllib3.exceptions import MaxRetryError, ReadTimeoutError
 from ddpui.ddpprefect.prefect_service import (
+    http_adapter,
     prefect_get,
     prefect_put,
+    _json_body,
     prefect_post,
     prefect_delete_a_block,
+    prefect_delete_blocks_concurrently,
+    aprefect_get,
     HttpError,
     get_airbyte_server_block_id,
     get_airbye_connection_blocks,
@@ -38,6 +56,7 @@ from ddpui.ddpprefect.prefect_service import (
     delete_dbt_core_block,
     PrefectSecretBlockCreate,
     create_secret_block,
+    create_secret_and_dbt_cli_profile_blocks,
     delete_secret_block,
     update_dbt_core_block_credentials,
     update_dbt_core_block_schema,
@@ -50,21 +69,46 @@ from ddpui.ddpprefect.prefect_service import (
     update_dataflow,
     PrefectDataFlowUpdateSchema2,
     get_flow_runs_by_deployment_id,
+    get_flow_runs_by_deployment_ids,
+    get_last_flow_runs_by_deployment_ids,
     set_deployment_schedule,
     get_filtered_deployments,
     delete_deployment_by_id,
     get_deployment,
     get_flow_run_logs,
+    get_flow_runs_logs_by_ids,
+    prefect_get_concurrently,
+    ahedged_prefect_get,
     get_flow_run,
+    get_flow_runs_by_ids,
+    aprefect_post,
     create_deployment_flow_run,
     create_dbt_cli_profile_block,
+    lock_tasks_for_deployment,
 )
 
 PREFECT_PROXY_API_URL = os.getenv("PREFECT_PROXY_API_URL")
 
 
+def test_http_session_read_timeout_not_retried():
+    """a read timeout may be a request the proxy already has, it is not sent again"""
+    retry = http_adapter.max_retries
+    error = ReadTimeoutError(None, "/proxy/endpoint", "read timed out")
+    with pytest.raises(MaxRetryError):
+        retry.increment(method="GET", url="/proxy/endpoint", error=error)
+    with pytest.raises(ReadTimeoutError):
+        retry.increment(method="DELETE", url="/proxy/endpoint", error=error)
+
+
+def test_http_session_gateway_errors_retried_for_gets_only():
+    retry = http_adapter.max_retries
+    assert retry.is_retry("GET", 503)
+    assert not retry.is_retry("PUT", 503)
+    assert not retry.is_retry("DELETE", 503)
+
+
 # =============================================================================
-@patch("ddpui.ddpprefect.prefect_service.requests.get")
+@patch("ddpui.ddpprefect.prefect_service.http_session.get")
 def test_prefect_get_connection_error(mock_get: Mock):
     mock_get.side_effect = Exception("conn-error")
     with pytest.raises(HttpError) as excinfo:
@@ -77,7 +121,7 @@ def test_prefect_get_connection_error(mock_get: Mock):
     )
 
 
-@patch("ddpui.ddpprefect.prefect_service.requests.get")
+@patch("ddpui.ddpprefect.prefect_service.http_session.get")
 def test_prefect_get_other_error(mock_get: Mock):
     mock_get.return_value = Mock(
         raise_for_status=Mock(side_effect=Exception("another error")),
@@ -94,10 +138,10 @@ def test_prefect_get_other_error(mock_get: Mock):
     )
 
 
-@patch("ddpui.ddpprefect.prefect_service.requests.get")
+@patch("ddpui.ddpprefect.prefect_service.http_session.get")
 def test_prefect_get_success(mock_get: Mock):
     mock_get.return_value = Mock(
-        raise_for_status=Mock(), status_code=200, json=Mock(return_value={"k": "v"})
+        raise_for_status=Mock(), status_code=200, content=orjson.dumps({"k": "v"})
     )
     response = prefect_get("endpoint-3", timeout=3)
     assert response == {"k": "v"}
@@ -109,7 +153,7 @@ def test_prefect_get_success(mock_get: Mock):
 
 
 # =============================================================================
-@patch("ddpui.ddpprefect.prefect_service.requests.post")
+@patch("ddpui.ddpprefect.prefect_service.http_session.post")
 def test_prefect_post_connection_error(mock_post: Mock):
     mock_post.side_effect = Exception("conn-error")
     payload = {"k1": "v1", "k2": "v2"}
@@ -118,13 +162,13 @@ def test_prefect_post_connection_error(mock_post: Mock):
     assert str(excinfo.value) == "connection error"
     mock_post.assert_called_once_with(
         f"{PREFECT_PROXY_API_URL}/proxy/endpoint-1",
-        headers={"x-ddp-org": ""},
+        headers={"x-ddp-org": "", "Content-Type": "application/json"},
         timeout=1,
-        json=payload,
+        data=orjson.dumps(payload),
     )
 
 
-@patch("ddpui.ddpprefect.prefect_service.requests.post")
+@patch("ddpui.ddpprefect.prefect_service.http_session.post")
 def test_prefect_post_other_error(mock_post: Mock):
     mock_post.return_value = Mock(
         raise_for_status=Mock(side_effect=Exception("another error")),
@@ -137,30 +181,41 @@ def test_prefect_post_other_error(mock_post: Mock):
     assert str(excinfo.value) == "error-text"
     mock_post.assert_called_once_with(
         f"{PREFECT_PROXY_API_URL}/proxy/endpoint-2",
-        headers={"x-ddp-org": ""},
+        headers={"x-ddp-org": "", "Content-Type": "application/json"},
         timeout=2,
-        json=payload,
+        data=orjson.dumps(payload),
     )
 
 
-@patch("ddpui.ddpprefect.prefect_service.requests.post")
+@patch("ddpui.ddpprefect.prefect_service.http_session.post")
 def test_prefect_post_success(mock_post: Mock):
     mock_post.return_value = Mock(
-        raise_for_status=Mock(), status_code=200, json=Mock(return_value={"k": "v"})
+        raise_for_status=Mock(), status_code=200, content=orjson.dumps({"k": "v"})
     )
     payload = {"k1": "v1", "k2": "v2"}
     response = prefect_post("endpoint-3", payload, timeout=3)
     assert response == {"k": "v"}
     mock_post.assert_called_once_with(
         f"{PREFECT_PROXY_API_URL}/proxy/endpoint-3",
-        headers={"x-ddp-org": ""},
+        headers={"x-ddp-org": "", "Content-Type": "application/json"},
         timeout=3,
-        json=payload,
+        data=orjson.dumps(payload),
     )
 
 
+def test_json_body_matches_stdlib_json():
+    """request bodies decode to what json.dumps would have sent"""
+    payload = {"tasks": [{"seq": 1, "env": {}}], 2: None, "flag": True}
+    assert json.loads(_json_body(payload)) == json.loads(json.dumps(payload))
+
+
+def test_json_body_serialized():
+    """a body which is already serialized is sent as it is"""
+    assert _json_body(b'{"k":"v"}') == b'{"k":"v"}'
+
+
 # =============================================================================
-@patch("ddpui.ddpprefect.prefect_service.requests.put")
+@patch("ddpui.ddpprefect.prefect_service.http_session.put")
 def test_prefect_put_connection_error(mock_put: Mock):
     mock_put.side_effect = Exception("conn-error")
     payload = {"k1": "v1", "k2": "v2"}
@@ -169,13 +224,13 @@ def test_prefect_put_connection_error(mock_put: Mock):
     assert str(excinfo.value) == "connection error"
     mock_put.assert_called_once_with(
         f"{PREFECT_PROXY_API_URL}/proxy/endpoint-1",
-        headers={"x-ddp-org": ""},
+        headers={"x-ddp-org": "", "Content-Type": "application/json"},
         timeout=1,
-        json=payload,
+        data=orjson.dumps(payload),
     )
 
 
-@patch("ddpui.ddpprefect.prefect_service.requests.put")
+@patch("ddpui.ddpprefect.prefect_service.http_session.put")
 def test_prefect_put_other_error(mock_put: Mock):
     mock_put.return_value = Mock(
         raise_for_status=Mock(side_effect=Exception("another error")),
@@ -188,30 +243,103 @@ def test_prefect_put_other_error(mock_put: Mock):
     assert str(excinfo.value) == "error-text"
     mock_put.assert_called_once_with(
         f"{PREFECT_PROXY_API_URL}/proxy/endpoint-2",
-        headers={"x-ddp-org": ""},
+        headers={"x-ddp-org": "", "Content-Type": "application/json"},
         timeout=2,
-        json=payload,
+        data=orjson.dumps(payload),
     )
 
 
-@patch("ddpui.ddpprefect.prefect_service.requests.put")
+@patch("ddpui.ddpprefect.prefect_service.http_session.put")
 def test_prefect_put_success(mock_put: Mock):
     mock_put.return_value = Mock(
-        raise_for_status=Mock(), status_code=200, json=Mock(return_value={"k": "v"})
+        raise_for_status=Mock(), status_code=200, content=orjson.dumps({"k": "v"})
     )
     payload = {"k1": "v1", "k2": "v2"}
     response = prefect_put("endpoint-3", payload, timeout=3)
     assert response == {"k": "v"}
     mock_put.assert_called_once_with(
         f"{PREFECT_PROXY_API_URL}/proxy/endpoint-3",
-        headers={"x-ddp-org": ""},
+        headers={"x-ddp-org": "", "Content-Type": "application/json"},
+        timeout=3,
+        data=orjson.dumps(payload),
+    )
+
+
+# =============================================================================
+def test_aprefect_get_connection_error():
+    client = Mock(get=AsyncMock(side_effect=Exception("conn-error")))
+    with pytest.raises(HttpError) as excinfo:
+        asyncio.run(aprefect_get(client, "endpoint-1", timeout=1))
+    assert str(excinfo.value) == "connection error"
+    client.get.assert_awaited_once_with(
+        f"{PREFECT_PROXY_API_URL}/proxy/endpoint-1",
+        headers={},
+        timeout=1,
+    )
+
+
+def test_aprefect_get_other_error():
+    client = Mock(
+        get=AsyncMock(
+            return_value=Mock(
+                raise_for_status=Mock(side_effect=Exception("another error")),
+                status_code=400,
+                text="error-text",
+            )
+        )
+    )
+    with pytest.raises(HttpError) as excinfo:
+        asyncio.run(aprefect_get(client, "endpoint-2", timeout=2))
+    assert str(excinfo.value) == "error-text"
+
+
+def test_aprefect_get_success():
+    client = Mock(
+        get=AsyncMock(
+            return_value=Mock(
+                raise_for_status=Mock(),
+                status_code=200,
+                content=orjson.dumps({"k": "v"}),
+            )
+        )
+    )
+    response = asyncio.run(
+        aprefect_get(client, "endpoint-3", headers={"x-ddp-org": "org"}, timeout=3)
+    )
+    assert response == {"k": "v"}
+    client.get.assert_awaited_once_with(
+        f"{PREFECT_PROXY_API_URL}/proxy/endpoint-3",
+        headers={"x-ddp-org": "org"},
         timeout=3,
-        json=payload,
+    )
+
+
+def test_aprefect_post_success():
+    client = Mock(
+        post=AsyncMock(
+            return_value=Mock(
+                raise_for_status=Mock(),
+                status_code=200,
+                content=orjson.dumps({"k": "v"}),
+            )
+        )
+    )
+    response = asyncio.run(
+        aprefect_post(
+            client, "endpoint-4", {"k1": "v1"}, headers={"x-ddp-org": "org"}, timeout=4
+        )
+    )
+    assert response == {"k": "v"}
+    client.post.assert_awaited_once_with(
+        f"{PREFECT_PROXY_API_URL}/proxy/endpoint-4",
+        headers={"x-ddp-org": "org", "Content-Type": "application/json"},
+        timeout=4,
+        content=orjson.dumps({"k1": "v1"}),
     )
 
 
 # =============================================================================
-@patch("ddpui.ddpprefect.prefect_service.requests.delete")
+@patch("ddpui.ddpprefect.prefect_service.http_session.delete")
 def test_prefect_delete_a_block_connection_error(mock_delete: Mock):
     mock_delete.side_effect = Exception("conn-error")
     with pytest.raises(HttpError) as excinfo:
@@ -224,7 +352,7 @@ def test_prefect_delete_a_block_connection_error(mock_delete: Mock):
     )
 
 
-@patch("ddpui.ddpprefect.prefect_service.requests.delete")
+@patch("ddpui.ddpprefect.prefect_service.http_session.delete")
 def test_prefect_delete_a_block_other_error(mock_delete: Mock):
     mock_delete.return_value = Mock(
         raise_for_status=Mock(side_effect=Exception("another error")),
@@ -241,6 +369,26 @@ def test_prefect_delete_a_block_other_error(mock_delete: Mock):
     )
 
 
+@patch(
+    "ddpui.ddpprefect.prefect_service.aprefect_delete_a_block", new_callable=AsyncMock
+)
+def test_prefect_delete_blocks_concurrently(mock_adelete: AsyncMock):
+    error = HttpError(400, "error-text")
+    mock_adelete.side_effect = [None, error]
+    errors = prefect_delete_blocks_concurrently(["blockid-1", "blockid-2"])
+    assert errors == [None, error]
+    for call in mock_adelete.call_args_list:
+        assert call.kwargs["headers"] == {"x-ddp-org": ""}
+
+
+@patch(
+    "ddpui.ddpprefect.prefect_service.aprefect_delete_a_block", new_callable=AsyncMock
+)
+def test_prefect_delete_blocks_concurrently_empty(mock_adelete: AsyncMock):
+    assert prefect_delete_blocks_concurrently([]) == []
+    mock_adelete.assert_not_awaited()
+
+
 # =============================================================================
 @patch("ddpui.ddpprefect.prefect_service.prefect_get")
 def test_get_airbyte_server_block_id(mock_get: Mock):
@@ -522,6 +670,66 @@ def test_create_secret_block(mock_post: Mock):
     )
 
 
+@patch("ddpui.ddpprefect.prefect_service.aprefect_post", new_callable=AsyncMock)
+def test_create_secret_and_dbt_cli_profile_blocks(mock_apost: AsyncMock):
+    mock_apost.side_effect = lambda client, endpoint, payload, headers: {
+        "endpoint": endpoint
+    }
+    secret_block = PrefectSecretBlockCreate(block_name="bname", secret="secret")
+    (
+        secret_block_response,
+        cli_block_response,
+    ) = create_secret_and_dbt_cli_profile_blocks(
+        secret_block, "block-name", "profilename", "target", "postgres", None, {}
+    )
+    assert secret_block_response == {"endpoint": "blocks/secret/"}
+    assert cli_block_response == {"endpoint": "blocks/dbtcli/profile/"}
+    assert mock_apost.await_count == 2
+    assert mock_apost.call_args_list[1].args[2] == {
+        "blockName": "bname",
+        "secret": "secret",
+    }
+
+
+@patch("ddpui.ddpprefect.prefect_service.aprefect_post", new_callable=AsyncMock)
+def test_create_secret_and_dbt_cli_profile_blocks_no_secret(mock_apost: AsyncMock):
+    mock_apost.return_value = {"block_id": "cli-block-id"}
+    (
+        secret_block_response,
+        cli_block_response,
+    ) = create_secret_and_dbt_cli_profile_blocks(
+        None, "block-name", "profilename", "target", "postgres", None, {}
+    )
+    assert secret_block_response is None
+    assert cli_block_response == {"block_id": "cli-block-id"}
+    mock_apost.assert_awaited_once()
+
+
+@patch(
+    "ddpui.ddpprefect.prefect_service.aprefect_delete_a_block", new_callable=AsyncMock
+)
+@patch("ddpui.ddpprefect.prefect_service.aprefect_post", new_callable=AsyncMock)
+def test_create_secret_and_dbt_cli_profile_blocks_one_fails(
+    mock_apost: AsyncMock, mock_adelete: AsyncMock
+):
+    """the cli profile block is deleted again when the secret block can't be created"""
+
+    async def apost(client, endpoint, payload, headers):
+        if endpoint == "blocks/secret/":
+            raise HttpError(400, "secret-error")
+        return {"block_id": "cli-block-id"}
+
+    mock_apost.side_effect = apost
+    secret_block = PrefectSecretBlockCreate(block_name="bname", secret="secret")
+    with pytest.raises(HttpError) as excinfo:
+        create_secret_and_dbt_cli_profile_blocks(
+            secret_block, "block-name", "profilename", "target", "postgres", None, {}
+        )
+    assert str(excinfo.value) == "secret-error"
+    mock_adelete.assert_awaited_once()
+    assert mock_adelete.call_args.args[1] == "cli-block-id"
+
+
 @patch("ddpui.ddpprefect.prefect_service.prefect_delete_a_block")
 def test_delete_secret_block(mock_delete: Mock):
     delete_secret_block("blockid")
@@ -692,6 +900,140 @@ def test_get_flow_runs_by_deployment_id_insert_pfr(mock_get: Mock):
     )
 
 
+@patch("ddpui.ddpprefect.prefect_service.prefect_get")
+def test_get_flow_runs_by_deployment_id_skip_stored(mock_get: Mock):
+    flow_run = {
+        "id": "flowrunid",
+        "name": "flowrunname",
+        "startTime": "2021-01-01T00:00:00.000Z",
+        "expectedStartTime": "2021-01-01T00:00:00.000Z",
+        "totalRunTime": 10.0,
+        "status": "COMPLETED",
+        "state_name": "COMPLETED",
+    }
+    mock_get.return_value = {"flow_runs": [flow_run]}
+    # stored under another deployment, flow run ids are unique across deployments
+    PrefectFlowRun.objects.create(
+        deployment_id="depid2",
+        flow_run_id="flowrunid",
+        name="flowrunname",
+        start_time="2021-01-01T00:00:00.000Z",
+        expected_start_time="2021-01-01T00:00:00.000Z",
+        total_run_time=10.0,
+        status="COMPLETED",
+        state_name="COMPLETED",
+    )
+    response = get_flow_runs_by_deployment_id("depid1")
+    assert response == []
+    assert PrefectFlowRun.objects.filter(flow_run_id="flowrunid").count() == 1
+
+
+@patch("ddpui.ddpprefect.prefect_service.prefect_get")
+def test_get_flow_runs_by_deployment_id_stored_and_new(mock_get: Mock):
+    for day in range(1, 4):
+        PrefectFlowRun.objects.create(
+            deployment_id="depid1",
+            flow_run_id=f"stored-{day}",
+            name="flowrunname",
+            start_time=f"2021-01-0{day}T00:00:00.000Z",
+            expected_start_time=f"2021-01-0{day}T00:00:00.000Z",
+            total_run_time=10.0,
+            status="COMPLETED",
+            state_name="COMPLETED",
+        )
+    # prefect returns the new runs sorted by start-time DESC
+    mock_get.return_value = {
+        "flow_runs": [
+            {
+                "id": f"new-{day}",
+                "name": "flowrunname",
+                "startTime": f"2021-01-0{day}T00:00:00.000Z",
+                "expectedStartTime": f"2021-01-0{day}T00:00:00.000Z",
+                "totalRunTime": 10.0,
+                "status": "COMPLETED",
+                "state_name": "COMPLETED",
+            }
+            for day in [6, 5]
+        ]
+    }
+    response = get_flow_runs_by_deployment_id("depid1")
+    assert [flow_run["id"] for flow_run in response] == [
+        "new-6",
+        "new-5",
+        "stored-3",
+        "stored-2",
+        "stored-1",
+    ]
+    assert response[2] == PrefectFlowRun.objects.get(flow_run_id="stored-3").to_json()
+    mock_get.assert_called_once_with(
+        "flow_runs",
+        params={
+            "deployment_id": "depid1",
+            "limit": None,
+            "start_time_gt": "2021-01-03T00:00:00+00:00",
+        },
+        timeout=60,
+    )
+
+
+@patch("ddpui.ddpprefect.prefect_service.prefect_get_concurrently")
+def test_get_flow_runs_by_deployment_ids(mock_get_concurrently: Mock):
+    PrefectFlowRun.objects.create(
+        deployment_id="depid1",
+        flow_run_id="stored-1",
+        name="flowrunname",
+        start_time="2021-01-01T00:00:00.000Z",
+        expected_start_time="2021-01-01T00:00:00.000Z",
+        total_run_time=10.0,
+        status="COMPLETED",
+        state_name="COMPLETED",
+    )
+    mock_get_concurrently.return_value = [
+        {"flow_runs": []},
+        {
+            "flow_runs": [
+                {
+                    "id": "new-2",
+                    "name": "flowrunname",
+                    "startTime": "2021-01-02T00:00:00.000Z",
+                    "expectedStartTime": "2021-01-02T00:00:00.000Z",
+                    "totalRunTime": 10.0,
+                    "status": "COMPLETED",
+                    "state_name": "COMPLETED",
+                }
+            ]
+        },
+    ]
+    response = get_flow_runs_by_deployment_ids(["depid1", "depid2", "depid1"], 50)
+    assert [flow_run["id"] for flow_run in response["depid1"]] == ["stored-1"]
+    assert [flow_run["id"] for flow_run in response["depid2"]] == ["new-2"]
+    assert response["depid2"][0]["deployment_id"] == "depid2"
+    # each deployment is fetched once
+    mock_get_concurrently.assert_called_once_with(
+        [
+            "flow_runs?deployment_id=depid1&limit=50"
+            "&start_time_gt=2021-01-01T00%3A00%3A00%2B00%3A00",
+            "flow_runs?deployment_id=depid2&limit=50",
+        ],
+        timeout=60,
+    )
+
+
+@patch("ddpui.ddpprefect.prefect_service.prefect_get_concurrently")
+def test_get_flow_runs_by_deployment_ids_none(mock_get_concurrently: Mock):
+    assert get_flow_runs_by_deployment_ids([]) == {}
+    mock_get_concurrently.assert_not_called()
+
+
+@patch("ddpui.ddpprefect.prefect_service.prefect_get_concurrently")
+def test_get_last_flow_runs_by_deployment_ids(mock_get_concurrently: Mock):
+    mock_get_concurrently.return_value = [{"flow_runs": []}]
+    assert get_last_flow_runs_by_deployment_ids(["depid1"]) == {"depid1": None}
+    mock_get_concurrently.assert_called_once_with(
+        ["flow_runs?deployment_id=depid1&limit=1"], timeout=60
+    )
+
+
 @patch("ddpui.ddpprefect.prefect_service.prefect_post")
 def test_set_deployment_schedule(mock_post: Mock):
     set_deployment_schedule("depid1", "newstatus")
@@ -703,13 +1045,21 @@ def test_get_filtered_deployments(mock_post: Mock):
     mock_post.return_value = {"deployments": ["deployments"]}
     response = get_filtered_deployments("org", ["depid1", "depid2"])
     assert response == ["deployments"]
-    mock_post.assert_called_once_with(
-        "deployments/filter",
-        {"org_slug": "org", "deployment_ids": ["depid1", "depid2"]},
-    )
+    endpoint, body = mock_post.call_args[0]
+    assert endpoint == "deployments/filter"
+    assert orjson.loads(body) == {
+        "org_slug": "org",
+        "deployment_ids": ["depid1", "depid2"],
+    }
 
 
-@patch("ddpui.ddpprefect.prefect_service.requests.delete")
+@patch("ddpui.ddpprefect.prefect_service.prefect_post")
+def test_get_filtered_deployments_none(mock_post: Mock):
+    assert get_filtered_deployments("org", []) == []
+    mock_post.assert_not_called()
+
+
+@patch("ddpui.ddpprefect.prefect_service.http_session.delete")
 def test_delete_deployment_by_id_error(mock_delete: Mock):
     mock_delete.return_value = Mock(
         raise_for_status=Mock(side_effect=Exception("error")),
@@ -722,7 +1072,7 @@ def test_delete_deployment_by_id_error(mock_delete: Mock):
     assert str(excinfo.value) == "errortext"
 
 
-@patch("ddpui.ddpprefect.prefect_service.requests.delete")
+@patch("ddpui.ddpprefect.prefect_service.http_session.delete")
 def test_delete_deployment_by_id_success(mock_delete: Mock):
     mock_delete.return_value = Mock(
         raise_for_status=Mock(),
@@ -740,24 +1090,400 @@ def test_get_deployment(mock_get: Mock):
 
 
 @patch("ddpui.ddpprefect.prefect_service.prefect_get")
-def test_get_flow_run_logs(mock_get: Mock):
+def test_get_flow_run_logs(mock_get: Mock, clear_flow_run_cache):
     mock_get.return_value = "the-logs"
     response = get_flow_run_logs("flowrunid", 3)
     assert response == {"logs": "the-logs"}
     mock_get.assert_called_once_with("flow_runs/logs/flowrunid", params={"offset": 3})
 
+    # the flow run isn't known to have finished, so the logs are fetched again
+    get_flow_run_logs("flowrunid", 3)
+    assert mock_get.call_count == 2
 
+
+@patch("ddpui.ddpprefect.prefect_service.FLOW_RUN_LOGS_GRACE_PERIOD", 0)
 @patch("ddpui.ddpprefect.prefect_service.prefect_get")
-def test_get_flow_run(mock_get: Mock):
-    mock_get.return_value = "retval"
+def test_get_flow_run_logs_of_finished_flow_run_are_cached(
+    mock_get: Mock, clear_flow_run_cache
+):
+    mock_get.side_effect = [
+        {"id": "flowrunid", "state_type": "COMPLETED"},
+        "the-logs",
+        "the-next-logs",
+    ]
+    get_flow_run("flowrunid")
+
+    assert get_flow_run_logs("flowrunid", 0) == {"logs": "the-logs"}
+    assert get_flow_run_logs("flowrunid", 0) == {"logs": "the-logs"}
+    # every page is cached separately
+    assert get_flow_run_logs("flowrunid", 10) == {"logs": "the-next-logs"}
+    assert mock_get.call_count == 3
+
+
+@patch("ddpui.ddpprefect.prefect_service.prefect_get")
+def test_get_flow_run_logs_of_just_finished_flow_run_not_cached(
+    mock_get: Mock, clear_flow_run_cache
+):
+    """prefect may still be writing the last logs of a flow run which has just finished"""
+    mock_get.side_effect = [
+        {"id": "flowrunid", "state_type": "FAILED"},
+        "the-logs",
+        "the-logs-with-the-error",
+    ]
+    get_flow_run("flowrunid")
+
+    assert get_flow_run_logs("flowrunid", 0) == {"logs": "the-logs"}
+    assert get_flow_run_logs("flowrunid", 0) == {"logs": "the-logs-with-the-error"}
+    assert mock_get.call_count == 3
+
+
+@patch("ddpui.ddpprefect.prefect_service.prefect_get")
+def test_get_flow_runs_by_deployment_id_records_finished_at(
+    mock_get: Mock, clear_flow_run_cache
+):
+    """a listed run which has only just finished does not get its logs cached yet"""
+    flow_run = {
+        "name": "flowrunname",
+        "expectedStartTime": "2021-01-01T00:00:00.000Z",
+        "totalRunTime": 10.0,
+        "status": "COMPLETED",
+        "state_name": "COMPLETED",
+    }
+    mock_get.side_effect = [
+        {
+            "flow_runs": [
+                {
+                    **flow_run,
+                    "id": "justfinished",
+                    "startTime": (timezone.now() - timedelta(seconds=15)).isoformat(),
+                },
+                {**flow_run, "id": "finished", "startTime": "2021-01-01T00:00:00Z"},
+            ]
+        },
+        "the-logs",
+        "the-logs",
+        "the-logs-with-the-error",
+    ]
+    get_flow_runs_by_deployment_id("depid1")
+
+    assert get_flow_run_logs("finished", 0) == {"logs": "the-logs"}
+    assert get_flow_run_logs("finished", 0) == {"logs": "the-logs"}
+    assert get_flow_run_logs("justfinished", 0) == {"logs": "the-logs"}
+    assert get_flow_run_logs("justfinished", 0) == {"logs": "the-logs-with-the-error"}
+    assert mock_get.call_count == 4
+
+
+@patch("ddpui.ddpprefect.prefect_service.aprefect_get", new_callable=AsyncMock)
+def test_prefect_get_concurrently(mock_aget: AsyncMock):
+    mock_aget.side_effect = lambda client, endpoint, headers, **kwargs: {
+        "endpoint": endpoint,
+        **kwargs,
+    }
+    response = prefect_get_concurrently(["endpoint-1", "endpoint-2"], timeout=5)
+    assert response == [
+        {"endpoint": "endpoint-1", "timeout": 5},
+        {"endpoint": "endpoint-2", "timeout": 5},
+    ]
+    for call in mock_aget.call_args_list:
+        assert call.kwargs["headers"] == {"x-ddp-org": ""}
+
+
+@patch("ddpui.ddpprefect.prefect_service.aprefect_get", new_callable=AsyncMock)
+def test_ahedged_prefect_get_fast(mock_aget: AsyncMock):
+    mock_aget.return_value = "the-logs"
+    latencies = deque()
+    response = asyncio.run(
+        ahedged_prefect_get(
+            "client", "endpoint-1", latencies, asyncio.Semaphore(2), timeout=5
+        )
+    )
+    assert response == "the-logs"
+    mock_aget.assert_awaited_once_with("client", "endpoint-1", timeout=5)
+    assert len(latencies) == 1
+
+
+@patch("ddpui.ddpprefect.prefect_service.aprefect_get")
+def test_ahedged_prefect_get_slow(mock_aget: Mock):
+    """a call slower than the recent p95 is sent again, the first answer wins"""
+    responses = iter([("slow", 10), ("fast", 0)])
+
+    async def aget(client, endpoint, **kwargs):
+        response, delay = next(responses)
+        await asyncio.sleep(delay)
+        return response
+
+    mock_aget.side_effect = aget
+    latencies = deque([0.01] * 20)
+    response = asyncio.run(
+        ahedged_prefect_get("client", "endpoint-1", latencies, asyncio.Semaphore(2))
+    )
+    assert response == "fast"
+    assert mock_aget.call_count == 2
+
+
+@patch("ddpui.ddpprefect.prefect_service.aprefect_get")
+def test_ahedged_prefect_get_primary_fails(mock_aget: Mock):
+    """the original call failing before the hedge answers does not fail the read"""
+    responses = iter([("primary", 0.05), ("hedge", 0.1)])
+
+    async def aget(client, endpoint, **kwargs):
+        response, delay = next(responses)
+        await asyncio.sleep(delay)
+        if response == "primary":
+            raise HttpError(500, "connection error")
+        return response
+
+    mock_aget.side_effect = aget
+    latencies = deque([0.01] * 20)
+    response = asyncio.run(
+        ahedged_prefect_get("client", "endpoint-1", latencies, asyncio.Semaphore(2))
+    )
+    assert response == "hedge"
+    assert mock_aget.call_count == 2
+    assert len(latencies) == 21
+
+
+@patch("ddpui.ddpprefect.prefect_service.aprefect_get")
+def test_ahedged_prefect_get_both_fail(mock_aget: Mock):
+    """the read fails with the error of the original call once both calls have failed"""
+    responses = iter([("primary", 0.05), ("hedge", 0.1)])
+
+    async def aget(client, endpoint, **kwargs):
+        response, delay = next(responses)
+        await asyncio.sleep(delay)
+        raise HttpError(500, response)
+
+    mock_aget.side_effect = aget
+    latencies = deque([0.01] * 20)
+    with pytest.raises(HttpError) as excinfo:
+        asyncio.run(
+            ahedged_prefect_get("client", "endpoint-1", latencies, asyncio.Semaphore(2))
+        )
+    assert str(excinfo.value) == "primary"
+    assert mock_aget.call_count == 2
+    assert len(latencies) == 20
+
+
+@patch("ddpui.ddpprefect.prefect_service.aprefect_get")
+def test_ahedged_prefect_get_no_free_connection(mock_aget: Mock):
+    """a slow call is not hedged when every connection is in use"""
+
+    async def aget(client, endpoint, **kwargs):
+        await asyncio.sleep(0.05)
+        return "slow"
+
+    mock_aget.side_effect = aget
+    latencies = deque([0.01] * 20)
+    response = asyncio.run(
+        ahedged_prefect_get("client", "endpoint-1", latencies, asyncio.Semaphore(1))
+    )
+    assert response == "slow"
+    assert mock_aget.call_count == 1
+
+
+@patch("ddpui.ddpprefect.prefect_service.hedge_slots")
+@patch("ddpui.ddpprefect.prefect_service.aprefect_get")
+def test_ahedged_prefect_get_too_many_hedges(mock_aget: Mock, mock_hedge_slots: Mock):
+    """a slow call is not hedged when the process has enough hedges outstanding"""
+
+    async def aget(client, endpoint, **kwargs):
+        await asyncio.sleep(0.05)
+        return "slow"
+
+    mock_aget.side_effect = aget
+    mock_hedge_slots.acquire.return_value = False
+    latencies = deque([0.01] * 20)
+    response = asyncio.run(
+        ahedged_prefect_get("client", "endpoint-1", latencies, asyncio.Semaphore(2))
+    )
+    assert response == "slow"
+    assert mock_aget.call_count == 1
+    mock_hedge_slots.release.assert_not_called()
+
+
+def test_ahedged_prefect_get_queue_wait_not_counted():
+    """the time spent waiting for a connection is not recorded as latency"""
+
+    async def run():
+        connection_slots = asyncio.Semaphore(1)
+        latencies = deque()
+        with patch(
+            "ddpui.ddpprefect.prefect_service.aprefect_get", new_callable=AsyncMock
+        ) as mock_aget:
+            mock_aget.return_value = "the-logs"
+            async with connection_slots:
+                waiting = asyncio.ensure_future(
+                    ahedged_prefect_get(
+                        "client", "endpoint-1", latencies, connection_slots
+                    )
+                )
+                await asyncio.sleep(0.1)
+            assert await waiting == "the-logs"
+        return latencies
+
+    latencies = asyncio.run(run())
+    assert len(latencies) == 1
+    assert latencies[0] < 0.1
+
+
+@patch("ddpui.ddpprefect.prefect_service.aprefect_get", new_callable=AsyncMock)
+def test_get_flow_runs_logs_by_ids(mock_aget: AsyncMock, clear_flow_run_cache):
+    mock_aget.side_effect = lambda client, endpoint, headers, params: {
+        "logs": [endpoint],
+        "offset": params["offset"],
+    }
+    response = get_flow_runs_logs_by_ids(["frid1", "frid2", "frid1"])
+    assert response == {
+        "frid1": {"logs": {"logs": ["flow_runs/logs/frid1"], "offset": 0}},
+        "frid2": {"logs": {"logs": ["flow_runs/logs/frid2"], "offset": 0}},
+    }
+    assert mock_aget.await_count == 2
+
+
+@patch("ddpui.ddpprefect.prefect_service.aprefect_get", new_callable=AsyncMock)
+def test_get_flow_runs_logs_by_ids_empty(mock_aget: AsyncMock):
+    assert get_flow_runs_logs_by_ids([]) == {}
+    mock_aget.assert_not_awaited()
+
+
+@patch("ddpui.ddpprefect.prefect_service.FLOW_RUN_LOGS_GRACE_PERIOD", 0)
+@patch("ddpui.ddpprefect.prefect_service.aprefect_get", new_callable=AsyncMock)
+def test_get_flow_runs_logs_by_ids_of_finished_flow_runs_are_cached(
+    mock_aget: AsyncMock, clear_flow_run_cache
+):
+    mock_aget.side_effect = lambda client, endpoint, headers, **kwargs: (
+        {"id": "frid1", "state_type": "FAILED"}
+        if endpoint == "flow_runs/frid1"
+        else {"logs": [endpoint]}
+    )
+    get_flow_runs_by_ids(["frid1"])
+    mock_aget.reset_mock()
+
+    get_flow_runs_logs_by_ids(["frid1", "frid2"])
+    response = get_flow_runs_logs_by_ids(["frid1", "frid2"])
+
+    assert response == {
+        "frid1": {"logs": {"logs": ["flow_runs/logs/frid1"]}},
+        "frid2": {"logs": {"logs": ["flow_runs/logs/frid2"]}},
+    }
+    # only the logs of the flow run which may still be running are fetched again
+    assert mock_aget.await_count == 3
+    assert mock_aget.call_args.args[1] == "flow_runs/logs/frid2"
+
+
+@pytest.fixture
+def clear_flow_run_cache():
+    """finished flow runs are cached across calls"""
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@patch("ddpui.ddpprefect.prefect_service.prefect_get")
+def test_get_flow_run(mock_get: Mock, clear_flow_run_cache):
+    mock_get.return_value = {"id": "flowrunid", "state_type": "RUNNING"}
     response = get_flow_run("flowrunid")
-    assert response == "retval"
+    assert response == {"id": "flowrunid", "state_type": "RUNNING"}
+    mock_get.assert_called_once_with("flow_runs/flowrunid")
+
+    # a running flow run is fetched again
+    get_flow_run("flowrunid")
+    assert mock_get.call_count == 2
+
+
+@patch("ddpui.ddpprefect.prefect_service.prefect_get")
+def test_get_flow_run_terminal_state_is_cached(mock_get: Mock, clear_flow_run_cache):
+    mock_get.return_value = {"id": "flowrunid", "state_type": "COMPLETED"}
+    get_flow_run("flowrunid")
+    response = get_flow_run("flowrunid")
+    assert response == {"id": "flowrunid", "state_type": "COMPLETED"}
     mock_get.assert_called_once_with("flow_runs/flowrunid")
 
 
+@patch("ddpui.ddpprefect.prefect_service.aprefect_get", new_callable=AsyncMock)
+def test_get_flow_runs_by_ids(mock_aget: AsyncMock, clear_flow_run_cache):
+    mock_aget.side_effect = lambda client, endpoint, headers: {
+        "id": endpoint.split("/")[-1]
+    }
+    response = get_flow_runs_by_ids(["frid1", "frid2", "frid1"])
+    assert response == {"frid1": {"id": "frid1"}, "frid2": {"id": "frid2"}}
+    assert mock_aget.await_count == 2
+
+
+@patch("ddpui.ddpprefect.prefect_service.aprefect_get", new_callable=AsyncMock)
+def test_get_flow_runs_by_ids_empty(mock_aget: AsyncMock):
+    assert get_flow_runs_by_ids([]) == {}
+    mock_aget.assert_not_awaited()
+
+
+@patch("ddpui.ddpprefect.prefect_service.aprefect_get", new_callable=AsyncMock)
+def test_get_flow_runs_by_ids_terminal_states_are_cached(
+    mock_aget: AsyncMock, clear_flow_run_cache
+):
+    mock_aget.side_effect = lambda client, endpoint, headers: {
+        "id": endpoint.split("/")[-1],
+        "state_type": "FAILED" if endpoint.endswith("frid1") else "RUNNING",
+    }
+    get_flow_runs_by_ids(["frid1", "frid2"])
+    assert mock_aget.await_count == 2
+
+    response = get_flow_runs_by_ids(["frid1", "frid2"])
+    assert response == {
+        "frid1": {"id": "frid1", "state_type": "FAILED"},
+        "frid2": {"id": "frid2", "state_type": "RUNNING"},
+    }
+    # only the running flow run is fetched again
+    assert mock_aget.await_count == 3
+    assert mock_aget.call_args.args[1] == "flow_runs/frid2"
+
+
 @patch("ddpui.ddpprefect.prefect_service.prefect_post")
 def test_create_deployment_flow_run(mock_post: Mock):
     mock_post.return_value = "retval"
     response = create_deployment_flow_run("depid")
     assert response == "retval"
     mock_post.assert_called_once_with("deployments/depid/flow_run", {})
+
+
+def test_lock_tasks_for_deployment():
+    org = Org.objects.create(name="temp-org", slug="temp-org")
+    user = User.objects.create(email="tempuseremail", username="tempusername")
+    orguser = OrgUser.objects.create(user=user, org=org)
+    dataflow = OrgDataFlowv1.objects.create(
+        org=org, name="dataflow", deployment_id="depid", dataflow_type="orchestrate"
+    )
+    for seq, slug in enumerate(["git-pull", "dbt-run"]):
+        task = Task.objects.create(type="dbt", slug=slug, label=slug)
+        org_task = OrgTask.objects.create(org=org, task=task)
+        DataflowOrgTask.objects.create(dataflow=dataflow, orgtask=org_task, seq=seq)
+
+    locks = lock_tasks_for_deployment("depid", orguser)
+
+    assert len(locks) == 2
+    for lock in TaskLock.objects.filter(orgtask__org=org):
+        assert lock.locked_by == orguser
+        assert lock.locking_dataflow == dataflow
+
+    # the deployment is locked now
+    with pytest.raises(HttpError) as excinfo:
+        lock_tasks_for_deployment("depid", orguser)
+    assert str(excinfo.value) == "tempuseremail is running this pipeline right now"
+
+
+def test_lock_tasks_for_deployment_repeated_orgtask():
+    """an orgtask which runs twice in a pipeline is locked once"""
+    org = Org.objects.create(name="temp-org", slug="temp-org")
+    user = User.objects.create(email="tempuseremail", username="tempusername")
+    orguser = OrgUser.objects.create(user=user, org=org)
+    dataflow = OrgDataFlowv1.objects.create(
+        org=org, name="dataflow", deployment_id="depid", dataflow_type="orchestrate"
+    )
+    task = Task.objects.create(type="dbt", slug="dbt-run", label="dbt-run")
+    org_task = OrgTask.objects.create(org=org, task=task)
+    for seq in range(2):
+        DataflowOrgTask.objects.create(dataflow=dataflow, orgtask=org_task, seq=seq)
+
+    locks = lock_tasks_for_deployment("depid", orguser)
+
+    assert len(locks) == 1
+    assert TaskLock.objects.filter(orgtask=org_task).count() == 1
@@ -0,0 +1,23 @@
+import asyncio
+import sys
+from unittest.mock import patch
+
+from ddpui.utils.eventloop import use_uvloop
+
+
+def test_use_uvloop():
+    """uvloop's policy is installed where uvloop is available"""
+    policy = asyncio.get_event_loop_policy()
+    try:
+        assert use_uvloop() is True
+        assert type(asyncio.get_event_loop_policy()).__module__.startswith("uvloop")
+    finally:
+        asyncio.set_event_loop_policy(policy)
+
+
+def test_use_uvloop_not_installed():
+    """without uvloop the default event loop policy is kept"""
+    policy = asyncio.get_event_loop_policy()
+    with patch.dict(sys.modules, {"uvloop": None}):
+        assert use_uvloop() is False
+    assert asyncio.get_event_loop_policy() is policy
@@ -0,0 +1,15 @@
+import asyncio
+
+
+def use_uvloop() -> bool:
+    """
+    the concurrent calls to the prefect proxy run on event loops created by async_to_sync,
+    make those uvloop loops where uvloop is installed (it isn't available on windows)
+    returns whether uvloop is in use
+    """
+    try:
+        import uvloop  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
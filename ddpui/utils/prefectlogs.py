@@ -7,85 +7,101 @@ import psycopg2
 logger = logging.getLogger()
 
 
+# the logs of a flow run are streamed from the prefect db this many rows at a time
+LOG_ROWS_PER_FETCH = 2000
+
+
 def fetch_logs_from_db(connection_info: dict, flow_run_id: str):
-    """fetches the logs from the prefect database"""
-
-    with psycopg2.connect(**connection_info) as connection:
-        cursor = connection.cursor()
-        query_tasks_from_flowrun = f"""
-            SELECT "log"."timestamp",
-                "task_run"."name",
-                "task_run"."state_name",
-                "task_run"."state_type",
-                "log"."message"
-            FROM "log"
-            JOIN "task_run"
-            ON "log"."task_run_id" = "task_run"."id"
-            WHERE "log"."flow_run_id" = '{flow_run_id}'
-            ORDER BY "timestamp"
-        """
-        cursor.execute(query_tasks_from_flowrun)
-        records = cursor.fetchall()
-
-        # for airbyte jobs the parent flow starts a subflow which runs the tasks
-        if len(records) == 0:
-            query_get_subflow_id = f"""
-                SELECT "flow_run"."id" 
-                FROM "flow_run" 
-                JOIN "task_run"
-                ON "task_run"."id" = "flow_run"."parent_task_run_id"
-                WHERE "task_run"."flow_run_id" = '{flow_run_id}'
-            """
-            cursor.execute(query_get_subflow_id)
-            records = cursor.fetchall()
-            if len(records) == 1:
-                subflow_id = records[0][0]
-                cursor.close()
-                return fetch_logs_from_db(connection_info, subflow_id)
-
-        cursor.close()
-    connection.close()
+    """
+    fetches the logs from the prefect database, sorted by timestamp
+    the rows are yielded as they come off a server-side cursor, so the logs of a long flow run
+    are never all in memory at once
+    """
     header = ["timestamp", "task_name", "state_name", "state_type", "message"]
 
-    return [dict(zip(header, record)) for record in records]
+    connection = psycopg2.connect(**connection_info)
+    try:
+        with connection:
+            # for airbyte jobs the parent flow starts a subflow which runs the tasks,
+            # walk down to the first flow run which has logs
+            while flow_run_id is not None:
+                # a named cursor is a server-side cursor
+                with connection.cursor(name="flow_run_logs") as cursor:
+                    cursor.itersize = LOG_ROWS_PER_FETCH
+                    query_tasks_from_flowrun = """
+                        SELECT "log"."timestamp",
+                            "task_run"."name",
+                            "task_run"."state_name",
+                            "task_run"."state_type",
+                            "log"."message"
+                        FROM "log"
+                        JOIN "task_run"
+                        ON "log"."task_run_id" = "task_run"."id"
+                        WHERE "log"."flow_run_id" = %s
+                        ORDER BY "timestamp"
+                    """
+                    cursor.execute(query_tasks_from_flowrun, (flow_run_id,))
+                    found_logs = False
+                    for record in cursor:
+                        found_logs = True
+                        yield dict(zip(header, record))
+                if found_logs:
+                    return
+
+                with connection.cursor() as cursor:
+                    query_get_subflow_id = """
+                        SELECT "flow_run"."id"
+                        FROM "flow_run"
+                        JOIN "task_run"
+                        ON "task_run"."id" = "flow_run"."parent_task_run_id"
+                        WHERE "task_run"."flow_run_id" = %s
+                    """
+                    cursor.execute(query_get_subflow_id, (flow_run_id,))
+                    records = cursor.fetchall()
+                flow_run_id = records[0][0] if len(records) == 1 else None
+    finally:
+        connection.close()
+
+
+# every line of every log goes through these, so they are compiled once
+ANSI_ESCAPE = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
+TIMESTAMP = re.compile(r"\d{2}:\d{2}:\d{2}")
+SKIP_LINE_PATTERNS = [
+    re.compile(r"^PID \d+ .*"),
+    re.compile(r"Running with dbt=.*"),
+    re.compile(r"Registered adapter: .*"),
+    re.compile(r"Concurrency:.*"),
+    re.compile(r"Building catalog.*"),
+    re.compile(r"Catalog written to .*"),
+    re.compile(r"Completed successfully.*"),
+    re.compile(r"Finished in state .*"),
+    re.compile(r"There are 1 unused configuration paths:"),
+    re.compile(r"Update your versions in packages.yml, then run dbt deps"),
+    re.compile(r"^- models\."),
+    re.compile(
+        r"Configuration paths exist in your dbt_project.yml file which do not apply to any resources"
+    ),
+    re.compile(
+        r"Unable to do partial parsing because saved manifest not found. Starting full parse."
+    ),
+    re.compile(r"(2[0-3]|[01]?[0-9]):([0-5]?[0-9]):([0-5]?[0-9])$"),
+]
 
 
 def remove_color_codes(line: str):
     """Remove terminal color codes from the line"""
-    ansi_escape = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
-    return ansi_escape.sub("", line)
+    return ANSI_ESCAPE.sub("", line)
 
 
 def remove_timestamps(line: str):
     """Remove timestamps from the line"""
-    return re.sub(r"\d{2}:\d{2}:\d{2}", "", line)
+    return TIMESTAMP.sub("", line)
 
 
 def skip_line(line: str):
     """returns whether a line should be skipped"""
-    patterns = [
-        re.compile(r"^PID \d+ .*"),
-        re.compile(r"Running with dbt=.*"),
-        re.compile(r"Registered adapter: .*"),
-        re.compile(r"Concurrency:.*"),
-        re.compile(r"Building catalog.*"),
-        re.compile(r"Catalog written to .*"),
-        re.compile(r"Completed successfully.*"),
-        re.compile(r"Finished in state .*"),
-        re.compile(r"There are 1 unused configuration paths:"),
-        re.compile(r"Update your versions in packages.yml, then run dbt deps"),
-        re.compile(r"^- models\."),
-        re.compile(
-            r"Configuration paths exist in your dbt_project.yml file which do not apply to any resources"
-        ),
-        re.compile(
-            r"Unable to do partial parsing because saved manifest not found. Starting full parse."
-        ),
-        re.compile(r"(2[0-3]|[01]?[0-9]):([0-5]?[0-9]):([0-5]?[0-9])$"),
-    ]
-    if any([pattern.search(line) for pattern in patterns]):
-        return True
-    return False
+    # stops at the first pattern that matches
+    return any(pattern.search(line) for pattern in SKIP_LINE_PATTERNS)
 
 
 def parse_airbyte_wait_for_completion_log(line: str):
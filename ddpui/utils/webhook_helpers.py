@@ -106,6 +106,15 @@ def email_orgusers(org: Org, email_body: str):
 
 def email_flowrun_logs_to_orgusers(org: Org, flow_run_id: str):
     """retrieves logs for a flow-run and emails them to all users for the org"""
+    if (
+        not org.ses_whitelisted_email
+        and not OrgUser.objects.filter(
+            org=org, new_role__slug=SUPER_ADMIN_ROLE
+        ).exists()
+    ):
+        # nobody to email, don't fetch the logs
+        logger.info(f"no one to notify in {org.slug} about flow run {flow_run_id}")
+        return
     logs = prefect_service.get_flow_run_logs(flow_run_id, 0)
     logmessages = [x["message"] for x in logs["logs"]["logs"]]
     email_body = generate_notification_email(org.name, flow_run_id, logmessages)
@@ -11,6 +11,10 @@ import os
 
 from django.core.wsgi import get_wsgi_application
 
+from ddpui.utils.eventloop import use_uvloop
+
+use_uvloop()
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ddpui.settings")
 
 application = get_wsgi_application()